@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('styles.qss', '.'), ('example_en.ts', '.'), ('example_en_zh.ts', '.')],
-    hiddenimports=['PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'argostranslate', 'argostranslate.package', 'argostranslate.translate', 'pandas', 'lxml.etree', 'lxml._elementpath', 'pathlib', 'logging', 'sys', 'os', 'typing'],
+    hiddenimports=['PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'argostranslate', 'argostranslate.package', 'argostranslate.translate', 'styles_data', 'lxml.etree', 'lxml._elementpath', 'pathlib', 'logging', 'sys', 'os', 'typing'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -7,28 +7,257 @@
 
 import os
 import sys
+import csv
+import hashlib
 import argparse
+import itertools
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Tuple
-import pandas as pd
-from main import TsTranslator
+from typing import List, Dict, Optional, Tuple, Iterator
+from translation_cache import TranslationMemory, get_shared_memory, DEFAULT_TM_PATH
+
+
+# TS文件后缀（不区分大小写）
+TS_SUFFIXES = ('.ts', '.TS', '.Ts', '.tS')
+
+# 报告CSV的列
+REPORT_FIELDNAMES = ['input_file', 'output_file', 'status', 'total_entries',
+                     'translated', 'skipped', 'error']
+
+# 记录源文件哈希的附属文件后缀，用于增量翻译判断
+SIDECAR_SUFFIX = '.tsch'
+
+# 查找TS文件时跳过的目录
+PRUNE_DIRS = {'.git', '.hg', '.svn', 'node_modules', 'build', 'dist', '__pycache__'}
+
+# 工作进程内的翻译器和翻译记忆实例，由 _init_worker 在每个进程中创建一次
+_WORKER_TRANSLATOR = None
+_WORKER_TM = None
+
+
+def _empty_stats() -> Dict[str, int]:
+    """未执行翻译的文件使用的统计数据"""
+    return {'total': 0, 'translated': 0, 'skipped': 0}
+
+
+def _output_conflict(other_input: str) -> Dict:
+    """输出路径与另一个输入文件的输出相同时的结果（不翻译，避免并行写入同一文件）"""
+    return {
+        'output_file': None,
+        'stats': _empty_stats(),
+        'status': 'failed',
+        'error': f'输出文件与 {other_input} 的输出文件相同'
+    }
+
+
+def _path_key(path) -> str:
+    """用于比较的路径：绝对路径，并按平台规则统一大小写"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _file_digest(path: str) -> str:
+    """计算文件内容的BLAKE2哈希"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sidecar_path(output_path: str) -> str:
+    """输出文件对应的源文件哈希记录路径"""
+    return output_path + SIDECAR_SUFFIX
+
+
+def _write_sidecar(output_path: str, source_lang: str, target_lang: str, source_digest: str):
+    """记录生成输出文件时的翻译方向和源文件哈希（以制表符分隔）"""
+    try:
+        with open(_sidecar_path(output_path), 'w', encoding='utf-8') as f:
+            f.write(f"{source_lang}\t{target_lang}\t{source_digest}")
+    except OSError:
+        pass
+
+
+def _read_sidecar(output_path: str) -> Optional[Tuple[str, str, str]]:
+    """读取输出文件的记录，返回 (源语言, 目标语言, 源文件哈希)，不存在或格式不符时返回None"""
+    try:
+        with open(_sidecar_path(output_path), 'r', encoding='utf-8') as f:
+            fields = f.read().strip().split('\t')
+    except OSError:
+        return None
+    return tuple(fields) if len(fields) == 3 else None
+
+
+def scan_ts_files(directory: str) -> Iterator[str]:
+    """
+    递归扫描目录，逐个产出TS文件路径字符串
+    
+    使用 os.scandir 显式栈遍历，子项类型取自 DirEntry 缓存，
+    只对文件名做后缀字符串判断，匹配之前不构造任何路径对象
+    
+    Args:
+        directory: 要扫描的目录路径
+        
+    Yields:
+        TS文件路径
+    """
+    stack = [directory]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    # 跳过隐藏目录和构建产物目录
+                    if entry.name not in PRUNE_DIRS and not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.name.endswith(TS_SUFFIXES):
+                    yield entry.path
+
+
+def _pool_context():
+    """
+    选择进程池的启动方式
+    
+    Linux下使用fork：父进程此时只导入了翻译相关模块而没有加载模型，
+    子进程可以写时复制地共享这些已导入的模块，省去重复导入。
+    已加载的CTranslate2模型持有内部线程，无法安全地跨fork复用，
+    因此模型由各工作进程在初始化时各自加载。其他平台使用默认方式。
+    """
+    if sys.platform.startswith('linux'):
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def _import_translator():
+    """
+    延迟导入翻译器类
+    
+    导入main会加载Argos Translate及其模型依赖，推迟到真正需要翻译时再导入，
+    使 --help 和参数错误等路径可以快速返回
+    """
+    try:
+        from main import TsTranslator
+    except ImportError as e:
+        raise ImportError(f"无法加载翻译引擎，请先安装依赖 (pip install -r requirements.txt): {e}") from e
+    return TsTranslator
+
+
+def _init_worker(source_lang: str, target_lang: str, tm_path: str = None,
+                 log_level: int = logging.INFO, intra_threads: int = 0):
+    """
+    工作进程初始化函数，每个进程只创建一个翻译器并复用于所有任务
+    
+    Args:
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+        tm_path: 翻译记忆库路径（如果为None，则不使用翻译记忆）
+        log_level: 工作进程中翻译器的日志级别
+        intra_threads: 每个工作进程中模型使用的计算线程数（传给CTranslate2模型，
+            避免多个进程的计算线程争抢CPU）
+    """
+    global _WORKER_TRANSLATOR, _WORKER_TM
+    TsTranslator = _import_translator()
+    # 文件已由多个进程并行翻译，进程内不再并行提交批次
+    _WORKER_TRANSLATOR = TsTranslator(intra_threads=intra_threads, inter_threads=1)
+    _WORKER_TRANSLATOR.logger.setLevel(log_level)
+    # 进程启动时即加载模型，首个任务无需再等待
+    _WORKER_TRANSLATOR.warm_up(source_lang, target_lang)
+    # 各进程通过同一个SQLite库共享翻译记忆
+    # 子进程自行打开数据库连接，不复用fork时继承的连接
+    _WORKER_TM = TranslationMemory(tm_path) if tm_path else None
+
+
+def _translate_one(input_path: str, output_path: str, source_lang: str,
+                   target_lang: str, skip_translated: bool) -> Tuple[str, Dict]:
+    """
+    在工作进程中翻译单个TS文件
+    
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+        skip_translated: 是否跳过已有翻译的条目
+        
+    Returns:
+        (输入文件路径, 翻译结果字典)
+    """
+    return _translate_file(_WORKER_TRANSLATOR, _WORKER_TM, input_path, output_path,
+                           source_lang, target_lang, skip_translated)
+
+
+def _translate_file(translator, tm_cache, input_path: str, output_path: str,
+                    source_lang: str, target_lang: str, skip_translated: bool) -> Tuple[str, Dict]:
+    """使用给定的翻译器翻译单个TS文件，返回 (输入文件路径, 翻译结果字典)"""
+    try:
+        # 在翻译前计算哈希，记录的是实际被翻译的内容
+        source_digest = _file_digest(input_path)
+        stats = translator.translate_ts_file(
+            input_path,
+            output_path,
+            source_lang,
+            target_lang,
+            skip_translated,
+            tm_cache
+        )
+    except Exception as e:
+        stats = {'success': False, 'error': str(e)}
+    
+    if not stats.get('success'):
+        return input_path, {
+            'output_file': None,
+            'stats': _empty_stats(),
+            'status': 'failed',
+            'error': stats.get('error', '未知错误')
+        }
+    
+    _write_sidecar(output_path, source_lang, target_lang, source_digest)
+    
+    return input_path, {
+        'output_file': output_path,
+        'stats': {
+            'total': stats['total_count'],
+            'translated': stats['translated_count'],
+            'skipped': stats['skipped_count']
+        },
+        'status': 'success'
+    }
 
 
 class BatchTranslator:
     """批量翻译器类"""
     
-    def __init__(self, source_lang: str = "en", target_lang: str = "zh"):
+    def __init__(self, source_lang: str = "en", target_lang: str = "zh",
+                 tm_path: str = str(DEFAULT_TM_PATH), jobs: int = None,
+                 dry_run: bool = False, translator=None):
         """
         初始化批量翻译器
         
         Args:
             source_lang: 源语言代码
             target_lang: 目标语言代码
+            tm_path: 翻译记忆库路径（如果为None，则不使用翻译记忆）
+            jobs: 并行翻译的进程数（如果为None，则使用CPU核心数）
+            dry_run: 只列出翻译计划，不加载翻译模型也不执行翻译
+            translator: 复用已有的TsTranslator实例（如果为None，则新建）
         """
         self.source_lang = source_lang
         self.target_lang = target_lang
-        self.translator = TsTranslator()
+        self.tm_path = tm_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.dry_run = dry_run
+        if dry_run:
+            self.translator = None
+        elif translator is not None:
+            self.translator = translator
+        else:
+            TsTranslator = _import_translator()
+            self.translator = TsTranslator()
         self.logger = self._setup_logging()
     
     def _setup_logging(self) -> logging.Logger:
@@ -46,26 +275,37 @@ class BatchTranslator:
         
         return logger
     
-    def find_ts_files(self, directory: str) -> List[Path]:
+    def find_ts_files(self, directory: str) -> Iterator[Path]:
         """
-        在目录中查找所有TS文件
+        在目录中查找所有TS文件（生成器，边扫描边产出）
         
         Args:
             directory: 要搜索的目录路径
             
-        Returns:
-            TS文件路径列表
+        Yields:
+            TS文件路径
         """
-        directory_path = Path(directory)
-        if not directory_path.exists():
+        if not os.path.isdir(directory):
             raise FileNotFoundError(f"目录不存在: {directory}")
         
-        ts_files = list(directory_path.rglob("*.ts"))
-        self.logger.info(f"在目录 {directory} 中找到 {len(ts_files)} 个TS文件")
-        return ts_files
+        count = 0
+        for path in scan_ts_files(directory):
+            count += 1
+            yield Path(path)
+        
+        self.logger.info("在目录 %s 中找到 %d 个TS文件", directory, count)
+    
+    def _iter_input_files(self, input_paths: List[str]) -> Iterator[Path]:
+        """逐个产出输入路径中的TS文件（目录会被递归展开）"""
+        for path in input_paths:
+            # 先做字符串后缀判断，再调用 stat
+            if path.endswith(TS_SUFFIXES) and os.path.isfile(path):
+                yield Path(path)
+            elif os.path.isdir(path):
+                yield from self.find_ts_files(path)
     
     def batch_translate(self, input_paths: List[str], output_dir: str = None, 
-                       skip_translated: bool = True) -> Dict[str, Dict]:
+                       skip_translated: bool = True, report_file: str = None) -> Dict[str, Dict]:
         """
         批量翻译TS文件
         
@@ -73,65 +313,377 @@ class BatchTranslator:
             input_paths: 输入文件路径列表（可以是文件或目录）
             output_dir: 输出目录（如果为None，则输出到原文件目录）
             skip_translated: 是否跳过已有翻译的条目
+            report_file: 报告文件路径（如果指定，每个文件完成后立即写入一行）
             
         Returns:
             翻译结果统计字典
         """
-        all_ts_files = []
-        
-        # 收集所有TS文件
-        for path in input_paths:
-            path_obj = Path(path)
-            if path_obj.is_file() and path_obj.suffix.lower() == '.ts':
-                all_ts_files.append(path_obj)
-            elif path_obj.is_dir():
-                all_ts_files.extend(self.find_ts_files(str(path_obj)))
+        report = None
+        report_writer = None
+        if report_file:
+            report = open(report_file, 'w', newline='', encoding='utf-8-sig')
+            report_writer = csv.DictWriter(report, fieldnames=REPORT_FIELDNAMES)
+            report_writer.writeheader()
+            report.flush()
         
-        if not all_ts_files:
-            self.logger.warning("未找到任何TS文件")
-            return {}
+        try:
+            results = self._run_batch(input_paths, output_dir, skip_translated, report, report_writer)
+        finally:
+            if report is not None:
+                report.close()
         
+        if report_file:
+            self.logger.info("批量翻译报告已生成: %s", report_file)
+        return results
+    
+    def _run_batch(self, input_paths: List[str], output_dir: str, skip_translated: bool,
+                   report, report_writer) -> Dict[str, Dict]:
+        """执行批量翻译，结果在主进程中逐个收集并写入报告"""
         results = {}
         
-        for ts_file in all_ts_files:
-            self.logger.info(f"开始翻译文件: {ts_file}")
+        def record(ts_file: str, output_path: str, result: Dict):
+            """记录单个文件的结果"""
+            results[ts_file] = result
+            if report_writer is not None:
+                report_writer.writerow(self._report_row(ts_file, result))
+                report.flush()
             
-            try:
-                # 确定输出路径
-                if output_dir:
-                    output_path = Path(output_dir) / ts_file.name
-                else:
-                    output_path = ts_file.parent / f"{ts_file.stem}_{self.target_lang}.ts"
-                
-                # 执行翻译
-                stats = self.translator.translate_ts_file(
-                    str(ts_file), 
-                    str(output_path), 
+            if result['status'] == 'success':
+                self.logger.info("文件翻译完成: %s -> %s", ts_file, output_path)
+                if self.logger.isEnabledFor(logging.INFO):
+                    stats = result['stats']
+                    self.logger.info("翻译统计: 总条目 %d, 翻译 %d, 跳过 %d",
+                                     stats['total'], stats['translated'], stats['skipped'])
+            elif result['status'] == 'cached':
+                self.logger.info("输出文件已是最新，跳过: %s", ts_file)
+            elif result['status'] == 'would-translate':
+                self.logger.info("将翻译文件: %s -> %s", ts_file, output_path)
+            else:
+                self.logger.error("翻译文件失败 %s: %s", ts_file, result['error'])
+        
+        tasks = self._plan_tasks(input_paths, output_dir, skip_translated, record)
+        
+        if self.dry_run:
+            for ts_file, output_path in tasks:
+                record(ts_file, output_path, {
+                    'output_file': output_path,
+                    'stats': _empty_stats(),
+                    'status': 'would-translate'
+                })
+            if not results:
+                self.logger.warning("未找到任何TS文件")
+            return results
+        
+        # 预读至多 jobs 个任务：只有一个进程或一个文件时直接在当前进程中完成，
+        # 无需启动进程池并在子进程中重新加载模型；文件数少于 jobs 时只启动所需数量的进程
+        head = list(itertools.islice(tasks, self.jobs))
+        if not head:
+            if not results:
+                self.logger.warning("未找到任何TS文件")
+            return results
+        
+        if self.jobs == 1 or len(head) == 1:
+            for ts_file, output_path in itertools.chain(head, tasks):
+                self.logger.info("开始翻译文件: %s", ts_file)
+                _, result = _translate_file(self.translator, self._get_translation_memory(),
+                                            ts_file, output_path, self.source_lang,
+                                            self.target_lang, skip_translated)
+                record(ts_file, output_path, result)
+            return results
+        
+        # 每个工作进程在启动时都会加载模型，进程数不超过实际的文件数
+        workers = min(self.jobs, len(head))
+        # 每个进程分到的计算线程数，使总线程数与CPU核心数一致
+        intra_threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        # 边收集文件边提交任务，目录扫描与翻译可以重叠进行
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=_pool_context(),
+                                 initializer=_init_worker,
+                                 initargs=(self.source_lang, self.target_lang, self.tm_path,
+                                           self.logger.level, intra_threads)) as executor:
+            futures = {}
+            for ts_file, output_path in itertools.chain(head, tasks):
+                self.logger.info("开始翻译文件: %s", ts_file)
+                future = executor.submit(
+                    _translate_one,
+                    ts_file,
+                    output_path,
                     self.source_lang,
                     self.target_lang,
                     skip_translated
                 )
-                
-                results[str(ts_file)] = {
+                futures[future] = (ts_file, output_path)
+            
+            for future in as_completed(futures):
+                ts_file, output_path = futures[future]
+                try:
+                    _, result = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等情况
+                    result = {
+                        'output_file': None,
+                        'stats': _empty_stats(),
+                        'status': 'failed',
+                        'error': str(e)
+                    }
+                record(ts_file, output_path, result)
+        
+        return results
+    
+    def _plan_tasks(self, input_paths: List[str], output_dir: str, skip_translated: bool,
+                    record) -> Iterator[Tuple[str, str]]:
+        """
+        逐个产出需要翻译的 (输入文件, 输出文件)
+        
+        已是最新的文件直接通过 record 记录为 cached，不再产出；
+        输出路径与先前文件相同的（如不同目录下的同名文件）记录为失败
+        """
+        # 输出目录在提交任务前一次性创建，工作进程中无需再检查
+        output_dir_path = None
+        if output_dir:
+            output_dir_path = Path(output_dir)
+            if not self.dry_run:
+                output_dir_path.mkdir(parents=True, exist_ok=True)
+        output_suffix = f"_{self.target_lang}.ts"
+        
+        # 路径统一为绝对路径并按平台规则比较大小写，同一文件的不同写法视为同一路径
+        planned_outputs = {}  # 输出文件 -> 输入文件
+        planned_inputs = set()  # 已计划翻译的输入文件（解析符号链接后的真实路径）
+        for ts_file in self._iter_input_files(input_paths):
+            # 扫描与翻译同时进行时，跳过本次已生成的输出文件
+            if _path_key(ts_file) in planned_outputs:
+                continue
+            # 同一文件以不同路径多次给出时只翻译一次
+            input_key = os.path.normcase(os.path.realpath(ts_file))
+            if input_key in planned_inputs:
+                continue
+            planned_inputs.add(input_key)
+            
+            # 确定输出路径
+            if output_dir_path is not None:
+                output_path = output_dir_path / ts_file.name
+            else:
+                output_path = ts_file.parent / (ts_file.stem + output_suffix)
+            output_key = _path_key(output_path)
+            other_input = planned_outputs.get(output_key)
+            if other_input is not None:
+                self.logger.error("输出文件冲突: %s 与 %s 都将写入 %s", ts_file, other_input, output_path)
+                record(str(ts_file), str(output_path), _output_conflict(other_input))
+                continue
+            planned_outputs[output_key] = str(ts_file)
+            
+            # 增量翻译：输出文件已是最新时跳过整个文件
+            if skip_translated and self._is_up_to_date(ts_file, output_path):
+                record(str(ts_file), str(output_path), {
                     'output_file': str(output_path),
-                    'stats': stats,
-                    'status': 'success'
+                    'stats': _empty_stats(),
+                    'status': 'cached'
+                })
+                continue
+            
+            yield str(ts_file), str(output_path)
+    
+    def translate_files_batched(self, paths: List[str], out_paths: List[str],
+                                skip_translated: bool = True,
+                                progress_callback=None,
+                                stream_mode: bool = False) -> Dict[str, Dict]:
+        """
+        将多个TS文件中的待翻译文本合并后一次性批量翻译
+        
+        所有文件中重复的原文只翻译一次，模型调用开销由全部文件分摊
+        
+        Args:
+            paths: 输入文件路径列表
+            out_paths: 与输入一一对应的输出文件路径列表
+            skip_translated: 是否跳过已有翻译的条目
+            progress_callback: 进度回调 (已翻译数, 总数)
+            stream_mode: 流式读写TS文件，内存中只保留各文件待翻译的原文
+            
+        Returns:
+            翻译结果统计字典
+        """
+        translator = self.translator
+        results = {}
+        
+        # 多个输入对应同一输出文件时只翻译第一个，其余记录为失败
+        output_owners = {}
+        unique_paths, unique_out_paths = [], []
+        for ts_file, output_path in zip(paths, out_paths):
+            key = _path_key(output_path)
+            other_input = output_owners.get(key)
+            if other_input is not None:
+                self.logger.error("输出文件冲突: %s 与 %s 都将写入 %s", ts_file, other_input, output_path)
+                results[ts_file] = _output_conflict(other_input)
+                continue
+            output_owners[key] = ts_file
+            unique_paths.append(ts_file)
+            unique_out_paths.append(output_path)
+        paths, out_paths = unique_paths, unique_out_paths
+        
+        if paths and not translator.ensure_package(self.source_lang, self.target_lang):
+            for ts_file, output_path in zip(paths, out_paths):
+                results[ts_file] = {
+                    'output_file': None,
+                    'stats': _empty_stats(),
+                    'status': 'failed',
+                    'error': '翻译包安装失败'
                 }
-                
-                self.logger.info(f"文件翻译完成: {ts_file} -> {output_path}")
-                self.logger.info(f"翻译统计: 总条目 {stats['total']}, 翻译 {stats['translated']}, 跳过 {stats['skipped']}")
-                
-            except Exception as e:
-                self.logger.error(f"翻译文件失败 {ts_file}: {str(e)}")
-                results[str(ts_file)] = {
+            return results
+        
+        # 文件的解析和写出在线程池中并行进行，模型翻译仍合并为一次批量调用
+        workers = max(1, min(len(paths), (os.cpu_count() or 2) // 2))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # 解析全部文件，收集待翻译条目
+            parsed_files = list(pool.map(
+                lambda ts_file: self._parse_for_batch(ts_file, skip_translated, stream_mode), paths
+            ))
+            
+            parsed = []  # (输入文件, 输出文件, 文档树与待翻译条目, 待翻译原文, 跳过数, 总条目数)
+            seeds = {}   # 各文件中已完成的译文，重复出现的原文直接沿用
+            for ts_file, output_path, item in zip(paths, out_paths, parsed_files):
+                if item is None:
+                    results[ts_file] = {
+                        'output_file': None,
+                        'stats': _empty_stats(),
+                        'status': 'failed',
+                        'error': '没有找到可翻译的内容'
+                    }
+                    continue
+                document, pending, skipped_count, total_count, file_seeds = item
+                for source, text in file_seeds.items():
+                    seeds.setdefault(source, text)
+                parsed.append((ts_file, output_path, document, pending, skipped_count, total_count))
+            
+            # 所有文件的原文合并后统一翻译
+            sources = [source for _, _, _, pending, _, _ in parsed for source in pending]
+            translated = translator.translate_sources(
+                sources, self.source_lang, self.target_lang,
+                self._get_translation_memory(), progress_callback, seeds
+            )
+            
+            # 写回各个文件
+            errors = list(pool.map(
+                lambda item: self._write_for_batch(item[0], item[1], item[2], translated, skip_translated),
+                parsed
+            ))
+        
+        for (ts_file, output_path, _, pending, skipped_count, total_count), error in zip(parsed, errors):
+            if error is not None:
+                results[ts_file] = {
                     'output_file': None,
-                    'stats': None,
+                    'stats': _empty_stats(),
                     'status': 'failed',
-                    'error': str(e)
+                    'error': error
                 }
+                continue
+            
+            results[ts_file] = {
+                'output_file': output_path,
+                'stats': {
+                    'total': total_count,
+                    'translated': len(pending),
+                    'skipped': skipped_count
+                },
+                'status': 'success'
+            }
         
         return results
     
+    def _parse_for_batch(self, ts_file: str, skip_translated: bool, stream_mode: bool):
+        """
+        解析单个文件供合并翻译使用
+        
+        Returns:
+            (文档树与待翻译条目, 待翻译原文, 跳过数, 总条目数, 已有译文)，流式模式下第一项为None；
+            没有可翻译内容时返回None
+        """
+        translator = self.translator
+        file_seeds = {}
+        if stream_mode:
+            try:
+                sources, skipped_count, total_count = translator.scan_ts_file(
+                    ts_file, skip_translated, file_seeds
+                )
+            except Exception as e:
+                self.logger.error("解析TS文件失败 %s: %s", ts_file, e)
+                return None
+            if not total_count:
+                return None
+            return None, sources, skipped_count, total_count, file_seeds
+        
+        tree, translations = translator.parse_ts_file(ts_file)
+        if not translations:
+            return None
+        
+        # 一次遍历分出待翻译条目，写回时只处理这些条目
+        pending = []
+        for trans in translations:
+            if translator.needs_translation(trans['translation'], trans['type'], skip_translated):
+                pending.append(trans)
+            elif translator.is_final_translation(trans['type']):
+                file_seeds.setdefault(trans['source'], trans['translation'])
+        sources = [trans['source'] for trans in pending]
+        skipped_count = len(translations) - len(pending)
+        return (tree, pending), sources, skipped_count, len(translations), file_seeds
+    
+    def _write_for_batch(self, ts_file: str, output_path: str, parsed,
+                         translated: Dict[str, str], skip_translated: bool):
+        """写出单个文件的翻译结果，成功返回None，失败返回错误信息"""
+        translator = self.translator
+        try:
+            if parsed is None:
+                translator.write_translated_ts_stream(ts_file, output_path, translated, skip_translated)
+            else:
+                tree, pending = parsed
+                for trans in pending:
+                    trans['translation'] = translated[trans['source']]
+                    trans['type'] = ''  # 清除unfinished标记
+                translator.generate_translated_ts(tree, output_path, pending)
+        except Exception as e:
+            return str(e)
+        return None
+    
+    def _get_translation_memory(self):
+        """获取当前进程共享的翻译记忆（延迟打开）"""
+        if not self.tm_path:
+            return None
+        return get_shared_memory(self.tm_path)
+    
+    def _is_up_to_date(self, ts_file: Path, output_path: Path) -> bool:
+        """
+        判断输出文件是否已是最新
+        
+        附属文件中记录的翻译方向须与本次一致；再比较修改时间，源文件更新时
+        比较记录的内容哈希，这样仅被touch而内容未变的源文件不会触发重新翻译
+        """
+        record = _read_sidecar(str(output_path))
+        if record is None:
+            return False
+        source_lang, target_lang, recorded_digest = record
+        if (source_lang, target_lang) != (self.source_lang, self.target_lang):
+            return False
+        
+        try:
+            if output_path.stat().st_mtime >= ts_file.stat().st_mtime:
+                return True
+            return recorded_digest == _file_digest(str(ts_file))
+        except OSError:
+            return False
+    
+    def _report_row(self, file_path: str, result: Dict) -> Dict:
+        """将单个文件的翻译结果转换为报告行"""
+        stats = result['stats']
+        return {
+            'input_file': file_path,
+            'output_file': result['output_file'],
+            'status': result['status'],
+            'total_entries': stats['total'],
+            'translated': stats['translated'],
+            'skipped': stats['skipped'],
+            'error': result.get('error', '')
+        }
+    
     def generate_report(self, results: Dict[str, Dict], report_file: str = "batch_translation_report.csv") -> str:
         """
         生成批量翻译报告
@@ -143,24 +695,14 @@ class BatchTranslator:
         Returns:
             报告文件路径
         """
-        report_data = []
-        
-        for file_path, result in results.items():
-            row = {
-                'input_file': file_path,
-                'output_file': result.get('output_file', ''),
-                'status': result.get('status', 'unknown'),
-                'total_entries': result.get('stats', {}).get('total', 0) if result.get('stats') else 0,
-                'translated': result.get('stats', {}).get('translated', 0) if result.get('stats') else 0,
-                'skipped': result.get('stats', {}).get('skipped', 0) if result.get('stats') else 0,
-                'error': result.get('error', '')
-            }
-            report_data.append(row)
+        # utf-8-sig 带BOM，便于Excel直接打开
+        with open(report_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDNAMES)
+            writer.writeheader()
+            for file_path, result in results.items():
+                writer.writerow(self._report_row(file_path, result))
         
-        df = pd.DataFrame(report_data)
-        df.to_csv(report_file, index=False, encoding='utf-8-sig')
-        
-        self.logger.info(f"批量翻译报告已生成: {report_file}")
+        self.logger.info("批量翻译报告已生成: %s", report_file)
         return report_file
 
 
@@ -174,30 +716,53 @@ def main():
     parser.add_argument('--no-skip', action='store_false', dest='skip_translated', 
                        help='不跳过已有翻译的条目')
     parser.add_argument('-r', '--report', help='报告文件路径 (默认: batch_translation_report.csv)')
+    parser.add_argument('--tm', default=str(DEFAULT_TM_PATH),
+                       help=f'翻译记忆库路径 (默认: {DEFAULT_TM_PATH})')
+    parser.add_argument('--no-tm', action='store_const', const=None, dest='tm',
+                       help='不使用翻译记忆')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                       help='并行翻译的进程数 (默认: CPU核心数；使用GPU时建议设为1)')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='只列出需要翻译的文件并生成报告，不执行翻译')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                       help='只输出警告和错误信息')
     
     args = parser.parse_args()
     
     # 创建批量翻译器
-    batch_translator = BatchTranslator(args.source, args.target)
+    batch_translator = BatchTranslator(args.source, args.target, args.tm, args.jobs,
+                                       args.dry_run)
+    if args.quiet:
+        batch_translator.logger.setLevel(logging.WARNING)
+        if batch_translator.translator is not None:
+            batch_translator.translator.logger.setLevel(logging.WARNING)
     
-    # 执行批量翻译
+    # 执行批量翻译，报告随每个文件完成逐行写入
+    report_file = args.report or "batch_translation_report.csv"
     results = batch_translator.batch_translate(
         args.input_paths, 
         args.output, 
-        args.skip_translated
+        args.skip_translated,
+        report_file
     )
     
-    # 生成报告
-    report_file = args.report or "batch_translation_report.csv"
-    batch_translator.generate_report(results, report_file)
-    
     # 打印摘要
     success_count = sum(1 for r in results.values() if r['status'] == 'success')
     failed_count = sum(1 for r in results.values() if r['status'] == 'failed')
+    cached_count = sum(1 for r in results.values() if r['status'] == 'cached')
+    
+    if args.dry_run:
+        pending_count = sum(1 for r in results.values() if r['status'] == 'would-translate')
+        print(f"\n翻译计划（未执行翻译）")
+        print(f"待翻译: {pending_count} 个文件")
+        print(f"已是最新: {cached_count} 个文件")
+        print(f"详细报告: {report_file}")
+        return
     
     print(f"\n批量翻译完成!")
     print(f"成功: {success_count} 个文件")
     print(f"失败: {failed_count} 个文件")
+    print(f"已是最新: {cached_count} 个文件")
     print(f"详细报告: {report_file}")
 
 
@@ -57,6 +57,15 @@ echo Starting application build...
 echo ================================================
 echo.
 
+REM Embed styles.qss into styles_data.py so the app needs no file I/O for styles
+echo Generating styles_data.py from styles.qss...
+python -c "import pathlib; pathlib.Path('styles_data.py').write_text('QSS = ' + repr(pathlib.Path('styles.qss').read_bytes()) + '\n', encoding='utf-8')"
+if errorlevel 1 (
+    echo [ERROR] Failed to generate styles_data.py
+    pause
+    exit /b 1
+)
+
 REM Set build parameters
 set APP_NAME=TsTranslationHelper
 set MAIN_FILE=gui_app.py
@@ -81,7 +90,7 @@ set PYINSTALLER_CMD=pyinstaller ^
     --hidden-import=argostranslate ^
     --hidden-import=argostranslate.package ^
     --hidden-import=argostranslate.translate ^
-    --hidden-import=pandas ^
+    --hidden-import=styles_data ^
     --hidden-import=lxml.etree ^
     --hidden-import=lxml._elementpath ^
     --hidden-import=pathlib ^
@@ -97,8 +106,12 @@ echo %PYINSTALLER_CMD%
 echo.
 
 %PYINSTALLER_CMD%
+set BUILD_RESULT=%errorlevel%
 
-if errorlevel 1 (
+REM Remove the generated module so development runs keep reading styles.qss
+if exist "styles_data.py" del "styles_data.py"
+
+if not "%BUILD_RESULT%"=="0" (
     echo [ERROR] Build failed, please check error messages
     pause
     exit /b 1
@@ -7,48 +7,191 @@ TS文件翻译工具 - 图形界面
 
 import sys
 import os
+import stat
+import time
+import threading
 import logging
+from collections import deque
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # PyQt5导入
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QTextEdit, QProgressBar, QFileDialog, QMessageBox,
                              QGroupBox, QComboBox, QCheckBox, QTabWidget,
-                             QListWidget, QListWidgetItem, QSplitter, QDesktopWidget)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                             QListView, QAbstractItemView, QSplitter, QDesktopWidget,
+                             QStyledItemDelegate, QStyleOptionViewItem)
+from PyQt5.QtCore import (Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal,
+                          QAbstractListModel, QModelIndex, QStringListModel)
 from PyQt5.QtGui import QFont, QPalette, QColor
 
 # 项目模块导入
 from main import TsTranslator
-from batch_translator import BatchTranslator
+from batch_translator import BatchTranslator, TS_SUFFIXES, scan_ts_files
+from translation_cache import get_shared_memory
 
+# 打包时由 build_exe.bat 生成的内嵌样式表（开发环境中不存在）
+try:
+    import styles_data
+except ImportError:
+    styles_data = None
 
-class TranslationThread(QThread):
-    """翻译线程类，用于后台执行翻译任务"""
+
+def _collect_ts_files(paths: List[str]) -> List[str]:
+    """
+    收集输入路径中的所有TS文件（目录会被递归展开）
+    
+    每个输入路径只调用一次 stat，目录交由 scan_ts_files 扫描
+    
+    Args:
+        paths: 输入文件或目录路径列表
+        
+    Returns:
+        TS文件路径列表
+    """
+    out = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        
+        if stat.S_ISREG(st.st_mode):
+            if p.endswith(TS_SUFFIXES):
+                out.append(p)
+        elif stat.S_ISDIR(st.st_mode):
+            out.extend(scan_ts_files(p))
+    return out
+
+
+class QTextEditLoggingHandler(logging.Handler):
+    """
+    将日志写入QTextEdit的日志处理器
+    
+    emit 只缓存日志记录，由GUI线程的定时器调用 write_pending 统一格式化并追加；
+    缓存满时丢弃最旧的记录，被丢弃的记录不会被格式化
+    """
+    
+    def __init__(self, widget: QTextEdit, max_records: int = 500):
+        super().__init__()
+        self.widget = widget
+        self._records = deque(maxlen=max_records)
+        self.setFormatter(logging.Formatter('%(message)s'))
+    
+    def emit(self, record: logging.LogRecord):
+        self._records.append(record)
+    
+    def write_pending(self):
+        """格式化缓存的日志记录，一次性追加到日志框（须在GUI线程中调用）"""
+        if not self._records:
+            return
+        lines = []
+        while self._records:
+            lines.append(self.format(self._records.popleft()))
+        self.widget.append("\n".join(lines))
+
+
+class PackageListModel(QAbstractListModel):
+    """可安装翻译包列表模型，数据保存在普通的Python列表中"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 每行: {'from_code', 'to_code', 'label', 'installed', 'checked'}
+        self._rows: List[Dict] = []
+    
+    def set_packages(self, rows: List[Dict]):
+        """整体替换列表内容（只触发一次模型重置）"""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return row['label']
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if row['checked'] else Qt.Unchecked
+        if role == Qt.UserRole:
+            return (row['from_code'], row['to_code'])
+        return None
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self._rows[index.row()]['installed']:
+            # 已安装的包：置灰且不可勾选
+            return Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+    
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        self._rows[index.row()]['checked'] = (value == Qt.Checked)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+
+class PackageDelegate(QStyledItemDelegate):
+    """按列表项的flags绘制：不可用（已安装）的包显示为灰色"""
+    
+    _DISABLED_COLOR = QColor(128, 128, 128)
+    
+    def paint(self, painter, option, index):
+        if not (index.flags() & Qt.ItemIsEnabled):
+            option = QStyleOptionViewItem(option)
+            option.palette.setColor(QPalette.Text, self._DISABLED_COLOR)
+        super().paint(painter, option, index)
+
+
+class TranslationSignals(QObject):
+    """单文件翻译任务的信号（QRunnable不能直接定义信号）"""
     
-    # 信号定义
     progress_updated = pyqtSignal(int, str)  # 进度值, 状态信息
     translation_finished = pyqtSignal(dict)  # 翻译结果
     error_occurred = pyqtSignal(str)  # 错误信息
+
+
+class BatchTranslationSignals(QObject):
+    """批量翻译任务的信号"""
+    
+    progress_updated = pyqtSignal(int, str, str)  # 进度值, 状态信息, 当前文件
+    batch_finished = pyqtSignal(dict)  # 批量翻译结果
+    error_occurred = pyqtSignal(str, str)  # 错误信息, 文件路径
+
+
+class TranslateOneJob(QRunnable):
+    """单文件翻译任务，在全局线程池中执行"""
     
     def __init__(self, translator: TsTranslator, input_file: str, 
-                 output_file: str, skip_translated: bool = True):
+                 output_file: str, skip_translated: bool = True,
+                 warmup_done: threading.Event = None, stream_mode: bool = True):
         super().__init__()
+        self.signals = TranslationSignals()
         self.translator = translator
         self.input_file = input_file
         self.output_file = output_file
         self.skip_translated = skip_translated
+        self.warmup_done = warmup_done
+        self.stream_mode = stream_mode  # 流式读写TS文件，降低大文件的内存占用
     
     def run(self):
         """执行翻译任务"""
         try:
+            # 等待后台预加载的模型就绪，避免与预加载同时初始化模型
+            if self.warmup_done is not None:
+                self.warmup_done.wait(timeout=30)
+            
             # 更新进度
-            self.progress_updated.emit(10, "正在解析TS文件...")
+            self.signals.progress_updated.emit(10, "正在解析TS文件...")
             
             # 执行翻译
-            self.progress_updated.emit(30, "正在翻译文本...")
+            self.signals.progress_updated.emit(30, "正在翻译文本...")
             # 获取语言设置（需要从主窗口获取）
             from_lang = "en"  # 默认源语言
             to_lang = "zh"     # 默认目标语言
@@ -57,103 +200,134 @@ class TranslationThread(QThread):
                 self.output_file, 
                 from_lang,
                 to_lang,
-                self.skip_translated
+                self.skip_translated,
+                get_shared_memory(),
+                self.stream_mode
             )
             
-            self.progress_updated.emit(100, "翻译完成!")
-            self.translation_finished.emit(stats)
+            self.signals.progress_updated.emit(100, "翻译完成!")
+            self.signals.translation_finished.emit(stats)
             
         except Exception as e:
-            self.error_occurred.emit(str(e))
+            self.signals.error_occurred.emit(str(e))
 
 
-class BatchTranslationThread(QThread):
-    """批量翻译线程类"""
-    
-    progress_updated = pyqtSignal(int, str, str)  # 进度值, 状态信息, 当前文件
-    batch_finished = pyqtSignal(dict)  # 批量翻译结果
-    error_occurred = pyqtSignal(str, str)  # 错误信息, 文件路径
+class BatchTranslateJob(QRunnable):
+    """批量翻译任务：全部文件的待翻译文本合并为一次翻译，在全局线程池中执行"""
     
     def __init__(self, batch_translator: BatchTranslator, input_paths: List[str], 
-                 output_dir: str = None, skip_translated: bool = True):
+                 output_dir: str = None, skip_translated: bool = True,
+                 warmup_done: threading.Event = None, stream_mode: bool = True):
         super().__init__()
+        self.signals = BatchTranslationSignals()
         self.batch_translator = batch_translator
         self.input_paths = input_paths
         self.output_dir = output_dir
         self.skip_translated = skip_translated
+        self.warmup_done = warmup_done
+        self.stream_mode = stream_mode
     
     def run(self):
         """执行批量翻译"""
         try:
-            results = {}
-            all_ts_files = []
+            if self.warmup_done is not None:
+                self.warmup_done.wait(timeout=30)
             
-            # 收集所有TS文件
-            for path in self.input_paths:
-                path_obj = Path(path)
-                if path_obj.is_file() and path_obj.suffix.lower() == '.ts':
-                    all_ts_files.append(path_obj)
-                elif path_obj.is_dir():
-                    all_ts_files.extend(self.batch_translator.find_ts_files(str(path_obj)))
+            # 收集所有TS文件（直接使用字符串路径，不构造Path对象）
+            collected = _collect_ts_files(self.input_paths)
+            # 同一文件可能既被单独添加又位于添加的目录中，按真实路径去重
+            seen = set()
+            paths = []
+            for p in collected:
+                real = os.path.realpath(p)
+                if real not in seen:
+                    seen.add(real)
+                    paths.append(p)
+            total_files = len(paths)
             
-            total_files = len(all_ts_files)
+            # 确定输出路径
+            if self.output_dir:
+                out_paths = [os.path.join(self.output_dir, os.path.basename(p)) for p in paths]
+            else:
+                suffix = f"_{self.batch_translator.target_lang}.ts"
+                out_paths = [os.path.splitext(p)[0] + suffix for p in paths]
             
-            for i, ts_file in enumerate(all_ts_files):
-                current_file = str(ts_file)
-                
-                # 更新进度
-                progress = int((i / total_files) * 100)
-                self.progress_updated.emit(progress, f"处理文件 {i+1}/{total_files}", current_file)
-                
-                try:
-                    # 确定输出路径
-                    if self.output_dir:
-                        output_path = Path(self.output_dir) / ts_file.name
-                    else:
-                        output_path = ts_file.parent / f"{ts_file.stem}_{self.batch_translator.target_lang}.ts"
-                    
-                    # 执行翻译
-                    stats = self.batch_translator.translator.translate_ts_file(
-                        str(ts_file), 
-                        str(output_path), 
-                        self.batch_translator.source_lang,
-                        self.batch_translator.target_lang,
-                        self.skip_translated
-                    )
-                    
-                    results[current_file] = {
-                        'output_file': str(output_path),
-                        'stats': stats,
-                        'status': 'success'
-                    }
-                    
-                except Exception as e:
-                    results[current_file] = {
-                        'output_file': None,
-                        'stats': None,
-                        'status': 'failed',
-                        'error': str(e)
-                    }
-                    self.error_occurred.emit(str(e), current_file)
+            duplicates = len(collected) - total_files
+            message = f"解析 {total_files} 个文件"
+            if duplicates:
+                message += f"（忽略 {duplicates} 个重复文件）"
+            self.signals.progress_updated.emit(0, message, "")
+            
+            # 限制信号频率：距上次发送超过50ms或进度百分比变化时才发送
+            last_emit = 0.0
+            last_pct = -1
+            
+            def on_progress(done: int, total: int):
+                nonlocal last_emit, last_pct
+                progress = done * 100 // total
+                now = time.monotonic()
+                if now - last_emit > 0.05 or progress != last_pct:
+                    last_emit = now
+                    last_pct = progress
+                    self.signals.progress_updated.emit(progress, f"翻译文本 {done}/{total}", "")
+            
+            # 全部文件的待翻译文本合并后一次性批量翻译
+            results = self.batch_translator.translate_files_batched(
+                paths,
+                out_paths,
+                self.skip_translated,
+                on_progress,
+                self.stream_mode
+            )
+            
+            self.signals.progress_updated.emit(100, f"完成 {total_files} 个文件", "")
+            
+            for current_file, result in results.items():
+                if result['status'] == 'failed':
+                    self.signals.error_occurred.emit(result['error'], current_file)
             
-            self.batch_finished.emit(results)
+            self.signals.batch_finished.emit(results)
             
         except Exception as e:
-            self.error_occurred.emit(str(e), "批量处理")
+            self.signals.error_occurred.emit(str(e), "批量处理")
 
 
 class TranslationApp(QMainWindow):
     """主应用程序窗口"""
     
+    # 样式表缓存，文件修改时间(st_mtime_ns)不变时不再重新读取
+    _CACHED_QSS: Optional[str] = None
+    _CACHED_QSS_MTIME: Optional[int] = None
+    
     def __init__(self):
         super().__init__()
         self.translator = None
         self.batch_translator = None
-        self.translation_thread = None
-        self.batch_thread = None
+        self.translation_job = None
+        self.batch_job = None
         self.first_time_enter_settings = True  # 标记首次进入设置
+        self._installed_pkg_ids: Optional[set] = None  # 已安装包 (源语言, 目标语言) 缓存
+        self._available_pkg_index: Optional[Dict] = None  # (源语言, 目标语言) -> 可用包
+        self._warmup_done = threading.Event()  # 翻译模型预加载完成标记
+        self._last_langs: Optional[tuple] = None  # 当前翻译器对应的 (源语言, 目标语言)
+        
+        # 日志先写入缓冲区，由定时器合并后统一追加，避免逐条刷新文档布局
+        self._log_buffer: List[str] = []
         
         self.init_ui()
+        
+        # 批量翻译日志通过logging写入，格式化推迟到定时器刷新时进行
+        self._batch_log_handler = QTextEditLoggingHandler(self.batch_status_text)
+        self._log = logging.getLogger("ts_translator.gui")
+        self._log.setLevel(logging.INFO)
+        self._log.propagate = False
+        self._log.addHandler(self._batch_log_handler)
+        
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(100)
+        self._log_timer.timeout.connect(self._flush_log)
+        self._log_timer.start()
+        
         self.setup_translator()
     
     def center(self):
@@ -171,16 +345,27 @@ class TranslationApp(QMainWindow):
     def apply_styles(self):
         """应用QSS样式"""
         try:
+            # 打包后的程序直接使用内嵌的样式表，无需读取文件
+            if styles_data is not None:
+                if TranslationApp._CACHED_QSS is None:
+                    TranslationApp._CACHED_QSS = styles_data.QSS.decode('utf-8')
+                self.setStyleSheet(TranslationApp._CACHED_QSS)
+                return
+            
             # 读取QSS样式文件
             stylesheet_path = Path(__file__).parent / "styles.qss"
-            if stylesheet_path.exists():
-                with open(stylesheet_path, 'r', encoding='utf-8') as f:
-                    stylesheet = f.read()
-                self.setStyleSheet(stylesheet)
-                print("QSS样式应用成功")
-            else:
+            try:
+                mtime = os.stat(stylesheet_path).st_mtime_ns
+            except FileNotFoundError:
                 # 如果样式文件不存在，使用内置的默认样式
                 self.apply_default_styles()
+                return
+            
+            if TranslationApp._CACHED_QSS is None or TranslationApp._CACHED_QSS_MTIME != mtime:
+                TranslationApp._CACHED_QSS = stylesheet_path.read_bytes().decode('utf-8')
+                TranslationApp._CACHED_QSS_MTIME = mtime
+            self.setStyleSheet(TranslationApp._CACHED_QSS)
+            print("QSS样式应用成功")
         except Exception as e:
             print(f"应用样式失败: {e}")
             # 使用内置的默认样式作为备选
@@ -220,7 +405,7 @@ class TranslationApp(QMainWindow):
             border-radius: 8px;
             margin-top: 10px;
         }
-        QLineEdit, QComboBox, QTextEdit, QListWidget {
+        QLineEdit, QComboBox, QTextEdit, QListView {
             border: 2px solid #d1d9e6;
             border-radius: 6px;
             padding: 8px;
@@ -332,6 +517,10 @@ class TranslationApp(QMainWindow):
         self.skip_translated_check.setChecked(True)
         settings_layout.addWidget(self.skip_translated_check)
         
+        # 完成提示默认显示在状态栏，勾选后改为弹窗
+        self.completion_popup_check = QCheckBox("完成后弹窗提示")
+        settings_layout.addWidget(self.completion_popup_check)
+        
         layout.addWidget(settings_group)
         
         # 进度显示
@@ -342,6 +531,7 @@ class TranslationApp(QMainWindow):
         self.status_text = QTextEdit()
         self.status_text.setMaximumHeight(100)
         self.status_text.setReadOnly(True)
+        self.status_text.document().setMaximumBlockCount(500)
         layout.addWidget(self.status_text)
         
         # 按钮
@@ -372,7 +562,11 @@ class TranslationApp(QMainWindow):
         
         # 文件列表
         list_layout = QHBoxLayout()
-        self.file_list = QListWidget()
+        self.file_list_model = QStringListModel()
+        self.file_list = QListView()
+        self.file_list.setObjectName("fileList")
+        self.file_list.setModel(self.file_list_model)
+        self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         list_layout.addWidget(self.file_list)
         
         # 按钮组
@@ -420,6 +614,7 @@ class TranslationApp(QMainWindow):
         self.batch_status_text = QTextEdit()
         self.batch_status_text.setMaximumHeight(100)
         self.batch_status_text.setReadOnly(True)
+        self.batch_status_text.document().setMaximumBlockCount(500)
         layout.addWidget(self.batch_status_text)
         
         # 批量翻译按钮
@@ -451,7 +646,10 @@ class TranslationApp(QMainWindow):
         installed_info = QLabel("当前已安装的翻译包:")
         installed_layout.addWidget(installed_info)
         
-        self.package_list = QListWidget()
+        self.package_list_model = QStringListModel()
+        self.package_list = QListView()
+        self.package_list.setObjectName("packageList")
+        self.package_list.setModel(self.package_list_model)
         installed_layout.addWidget(self.package_list)
         
         refresh_btn = QPushButton("刷新已安装包列表")
@@ -483,8 +681,12 @@ class TranslationApp(QMainWindow):
         available_layout.addLayout(lang_selection_layout)
         
         # 包列表和安装按钮
-        self.available_package_list = QListWidget()
-        self.available_package_list.setSelectionMode(QListWidget.MultiSelection)
+        self.available_package_model = PackageListModel(self)
+        self.available_package_list = QListView()
+        self.available_package_list.setObjectName("availablePackageList")
+        self.available_package_list.setModel(self.available_package_model)
+        self.available_package_list.setItemDelegate(PackageDelegate(self.available_package_list))
+        self.available_package_list.setSelectionMode(QAbstractItemView.MultiSelection)
         available_layout.addWidget(self.available_package_list)
 
         install_buttons_layout = QHBoxLayout()
@@ -537,16 +739,42 @@ class TranslationApp(QMainWindow):
             self.statusBar().showMessage("请手动点击'刷新可用包'按钮查看翻译包列表")
     
     def setup_translator(self):
-        """设置翻译器"""
+        """设置翻译器（语言未改变时复用已有的翻译器）"""
         try:
             source_lang = self.source_lang_combo.currentText()
             target_lang = self.target_lang_combo.currentText()
-            self.translator = TsTranslator()
-            self.batch_translator = BatchTranslator(source_lang, target_lang)
+            if (source_lang, target_lang) == self._last_langs and self.translator is not None:
+                return
+            
+            # 翻译器按语言对缓存模型，切换语言时也无需重建
+            if self.translator is None:
+                self.translator = TsTranslator()
+            # 单文件和批量翻译共用同一个翻译器，模型只需加载一次
+            self.batch_translator = BatchTranslator(source_lang, target_lang, translator=self.translator)
+            
+            # 在后台线程中预加载翻译模型，首次翻译时无需等待模型加载
+            self._warmup_done = threading.Event()
+            threading.Thread(
+                target=self._warmup_model,
+                args=(self.translator, source_lang, target_lang, self._warmup_done),
+                daemon=True
+            ).start()
+            self._last_langs = (source_lang, target_lang)
             self.statusBar().showMessage("翻译器初始化成功")
         except Exception as e:
             QMessageBox.warning(self, "错误", f"翻译器初始化失败: {str(e)}")
     
+    @staticmethod
+    def _warmup_model(translator: TsTranslator, source_lang: str, target_lang: str,
+                      done: threading.Event):
+        """预加载翻译模型（在后台线程中运行）"""
+        try:
+            translator.warm_up(source_lang, target_lang)
+        except Exception as e:
+            logging.getLogger('TranslationApp').warning(f"预加载翻译模型失败: {e}")
+        finally:
+            done.set()
+    
     def select_input_file(self):
         """选择输入文件"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -578,33 +806,42 @@ class TranslationApp(QMainWindow):
         files, _ = QFileDialog.getOpenFileNames(
             self, "选择TS文件", "", "TS Files (*.ts)"
         )
-        for file_path in files:
-            self.file_list.addItem(file_path)
+        if files:
+            paths = self.file_list_model.stringList()
+            paths.extend(files)
+            self.file_list_model.setStringList(paths)
     
     def add_folder(self):
         """添加文件夹到列表"""
         dir_path = QFileDialog.getExistingDirectory(self, "选择文件夹")
         if dir_path:
-            self.file_list.addItem(f"[目录] {dir_path}")
+            paths = self.file_list_model.stringList()
+            paths.append(f"[目录] {dir_path}")
+            self.file_list_model.setStringList(paths)
     
     def remove_file(self):
-        """移除选中文件"""
-        current_row = self.file_list.currentRow()
-        if current_row >= 0:
-            self.file_list.takeItem(current_row)
+        """移除选中文件（支持多选）"""
+        rows = {index.row() for index in self.file_list.selectionModel().selectedRows()}
+        if not rows:
+            return
+        # 一次性重建列表，视图只刷新一次
+        paths = self.file_list_model.stringList()
+        self.file_list_model.setStringList([p for i, p in enumerate(paths) if i not in rows])
     
     def clear_file_list(self):
         """清空文件列表"""
-        self.file_list.clear()
+        self.file_list_model.setStringList([])
     
     def refresh_packages(self):
         """刷新翻译包列表"""
         try:
-            self.package_list.clear()
+            labels = []
+            self._installed_pkg_ids = None
             if self.translator:
                 packages = self.translator.get_installed_packages()
-                for pkg in packages:
-                    self.package_list.addItem(f"{pkg.from_code} -> {pkg.to_code}")
+                labels = [f"{pkg.from_code} -> {pkg.to_code}" for pkg in packages]
+                self._installed_pkg_ids = {(pkg.from_code, pkg.to_code) for pkg in packages}
+            self.package_list_model.setStringList(labels)
         except Exception as e:
             QMessageBox.warning(self, "错误", f"刷新包列表失败: {str(e)}")
     
@@ -615,56 +852,57 @@ class TranslationApp(QMainWindow):
     def refresh_available_packages(self):
         """刷新可用翻译包列表"""
         try:
-            self.available_package_list.clear()
+            rows = []
             if self.translator:
-                packages = self.translator.get_available_packages()
-                installed_packages = self.translator.get_installed_packages()
+                installed_package_ids = self._get_installed_ids()
                 
                 # 过滤包，只显示与当前选择语言相关的包
                 source_lang = self.available_source_combo.currentText()
                 target_lang = self.available_target_combo.currentText()
                 
-                filtered_packages = []
-                for pkg in packages:
-                    # 如果选择了特定语言，只显示匹配的包
-                    if source_lang and target_lang:
-                        if pkg.from_code == source_lang and pkg.to_code == target_lang:
-                            filtered_packages.append(pkg)
-                    else:
-                        # 如果没有选择特定语言，显示所有包
-                        filtered_packages.append(pkg)
-                
-                # 获取已安装包的标识
-                installed_package_ids = set()
-                for installed_pkg in installed_packages:
-                    if hasattr(installed_pkg, 'from_code') and hasattr(installed_pkg, 'to_code'):
-                        installed_package_ids.add(f"{installed_pkg.from_code}->{installed_pkg.to_code}")
+                index = self._get_available_index()
+                if source_lang and target_lang:
+                    pkg = index.get((source_lang, target_lang))
+                    filtered_packages = [pkg] if pkg else []
+                else:
+                    # 如果没有选择特定语言，显示所有包
+                    filtered_packages = list(index.values())
                 
                 for pkg in filtered_packages:
                     item_text = f"{pkg.from_code} -> {pkg.to_code}"
                     if hasattr(pkg, 'package_name'):
                         item_text += f" ({pkg.package_name})"
                     
-                    item = QListWidgetItem(item_text)
-                    
-                    # 检查是否已安装
-                    package_id = f"{pkg.from_code}->{pkg.to_code}"
-                    if package_id in installed_package_ids:
-                        # 已安装的包：置灰且不可勾选
-                        item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
-                        item.setForeground(QColor(128, 128, 128))  # 灰色
-                        item.setCheckState(Qt.Unchecked)  # 未勾选
-                    else:
-                        # 未安装的包：正常显示且默认不勾选
-                        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                        item.setCheckState(Qt.Unchecked)  # 默认不勾选
-                    
-                    self.available_package_list.addItem(item)
+                    # 检查是否已安装，所有包默认不勾选
+                    rows.append({
+                        'from_code': pkg.from_code,
+                        'to_code': pkg.to_code,
+                        'label': item_text,
+                        'installed': (pkg.from_code, pkg.to_code) in installed_package_ids,
+                        'checked': False
+                    })
                 
                 self.statusBar().showMessage(f"找到 {len(filtered_packages)} 个可用翻译包")
+            self.available_package_model.set_packages(rows)
         except Exception as e:
             QMessageBox.warning(self, "错误", f"刷新可用包列表失败: {str(e)}")
     
+    def _get_installed_ids(self) -> set:
+        """获取已安装包的 (源语言, 目标语言) 集合（延迟构建并缓存）"""
+        if self._installed_pkg_ids is None:
+            self._installed_pkg_ids = {
+                (pkg.from_code, pkg.to_code) for pkg in self.translator.get_installed_packages()
+            }
+        return self._installed_pkg_ids
+    
+    def _get_available_index(self) -> Dict:
+        """获取按 (源语言, 目标语言) 索引的可用包字典（首次使用时从包索引构建）"""
+        if self._available_pkg_index is None:
+            self._available_pkg_index = {
+                (pkg.from_code, pkg.to_code): pkg for pkg in self.translator.get_available_packages()
+            }
+        return self._available_pkg_index
+    
     def on_language_selection_changed(self):
         """当语言选择改变时启用/禁用刷新按钮"""
         # 只有当两个语言都选择了才启用刷新按钮
@@ -681,17 +919,14 @@ class TranslationApp(QMainWindow):
         try:
             # 获取所有勾选的包
             selected_packages = []
-            for i in range(self.available_package_list.count()):
-                item = self.available_package_list.item(i)
-                if item.checkState() == Qt.Checked and item.isEnabled():
-                    # 从列表项文本中提取语言代码
-                    item_text = item.text()
-                    parts = item_text.split(" -> ")
-                    if len(parts) >= 2:
-                        from_lang = parts[0].strip()
-                        to_lang_parts = parts[1].split(" (")
-                        to_lang = to_lang_parts[0].strip()
-                        selected_packages.append((from_lang, to_lang))
+            model = self.available_package_model
+            for i in range(model.rowCount()):
+                index = model.index(i)
+                if index.data(Qt.CheckStateRole) == Qt.Checked and index.flags() & Qt.ItemIsEnabled:
+                    # 语言代码直接取自列表项数据 (源语言, 目标语言)
+                    data = index.data(Qt.UserRole)
+                    if data:
+                        selected_packages.append(data)
             
             if not selected_packages:
                 QMessageBox.warning(self, "警告", "请先勾选要安装的翻译包")
@@ -714,6 +949,7 @@ class TranslationApp(QMainWindow):
                             success = self.translator.install_package_by_codes(from_lang, to_lang)
                             if success:
                                 success_count += 1
+                                self._installed_pkg_ids = None
                             else:
                                 failed_packages.append(f"{from_lang} -> {to_lang}")
                         except Exception as e:
@@ -750,83 +986,113 @@ class TranslationApp(QMainWindow):
         self.setup_translator()
         
         # 创建并启动翻译线程
-        self.translation_thread = TranslationThread(
+        self.translation_job = TranslateOneJob(
             self.translator,
             input_file,
             output_file,
-            self.skip_translated_check.isChecked()
+            self.skip_translated_check.isChecked(),
+            self._warmup_done
         )
         
-        self.translation_thread.progress_updated.connect(self.update_progress)
-        self.translation_thread.translation_finished.connect(self.translation_completed)
-        self.translation_thread.error_occurred.connect(self.translation_error)
+        signals = self.translation_job.signals
+        signals.progress_updated.connect(self.update_progress, Qt.QueuedConnection)
+        signals.translation_finished.connect(self.translation_completed, Qt.QueuedConnection)
+        signals.error_occurred.connect(self.translation_error, Qt.QueuedConnection)
         
         self.progress_bar.setVisible(True)
         self.translate_btn.setEnabled(False)
         self.status_text.append("开始翻译...")
         
-        self.translation_thread.start()
+        QThreadPool.globalInstance().start(self.translation_job)
     
     def start_batch_translation(self):
         """开始批量翻译"""
-        if self.file_list.count() == 0:
+        if self.file_list_model.rowCount() == 0:
             QMessageBox.warning(self, "警告", "请添加要翻译的文件或文件夹")
             return
         
         # 收集文件路径
+        dir_prefix = "[目录] "
         input_paths = []
-        for i in range(self.file_list.count()):
-            item_text = self.file_list.item(i).text()
-            if item_text.startswith("[目录]"):
-                input_paths.append(item_text[6:])  # 移除"[目录] "前缀
+        for item_text in self.file_list_model.stringList():
+            if item_text.startswith(dir_prefix):
+                input_paths.append(item_text[len(dir_prefix):])  # 移除"[目录] "前缀
             else:
                 input_paths.append(item_text)
         
+        # 按解析符号链接和相对路径后的真实路径去重，同一文件或目录只处理一次；
+        # 保留用户添加的路径，输出文件生成在该路径旁而不是链接指向的位置
+        seen = set()
+        unique_paths = []
+        for p in input_paths:
+            real = os.path.realpath(p)
+            if real not in seen:
+                seen.add(real)
+                unique_paths.append(p)
+        dropped = len(input_paths) - len(unique_paths)
+        if dropped:
+            self._log.info("忽略 %d 个重复的输入路径", dropped)
+        input_paths = unique_paths
+        
         # 更新翻译器设置
         self.setup_translator()
         
         # 创建并启动批量翻译线程
         output_dir = self.batch_output_edit.text() or None
-        self.batch_thread = BatchTranslationThread(
+        self.batch_job = BatchTranslateJob(
             self.batch_translator,
             input_paths,
             output_dir,
-            True
+            True,
+            self._warmup_done
         )
         
-        self.batch_thread.progress_updated.connect(self.update_batch_progress)
-        self.batch_thread.batch_finished.connect(self.batch_translation_completed)
-        self.batch_thread.error_occurred.connect(self.batch_translation_error)
+        signals = self.batch_job.signals
+        signals.progress_updated.connect(self.update_batch_progress, Qt.QueuedConnection)
+        signals.batch_finished.connect(self.batch_translation_completed, Qt.QueuedConnection)
+        signals.error_occurred.connect(self.batch_translation_error, Qt.QueuedConnection)
         
         self.batch_progress_bar.setVisible(True)
         self.batch_translate_btn.setEnabled(False)
-        self.batch_status_text.append("开始批量翻译...")
+        self._log.info("开始批量翻译...")
         
-        self.batch_thread.start()
+        QThreadPool.globalInstance().start(self.batch_job)
     
     def update_progress(self, value: int, message: str):
         """更新进度"""
         self.progress_bar.setValue(value)
-        self.status_text.append(message)
+        self._log_buffer.append(message)
         self.statusBar().showMessage(message)
     
     def update_batch_progress(self, value: int, message: str, current_file: str):
         """更新批量进度"""
         self.batch_progress_bar.setValue(value)
-        self.batch_status_text.append(f"{message}: {current_file}")
+        self._log.info("%s: %s", message, current_file)
+    
+    def _flush_log(self):
+        """将缓冲的日志一次性追加到日志框"""
+        if self._log_buffer:
+            self.status_text.append("\n".join(self._log_buffer))
+            self._log_buffer.clear()
+        self._batch_log_handler.write_pending()
     
     def translation_completed(self, stats: dict):
         """翻译完成"""
         self.progress_bar.setValue(100)
         self.translate_btn.setEnabled(True)
         
-        if stats.get('success'):
-            message = f"翻译完成! 总条目: {stats['total_count']}, 翻译: {stats['translated_count']}, 跳过: {stats['skipped_count']}"
-        else:
+        self._flush_log()
+        if not stats.get('success'):
             message = f"翻译失败: {stats.get('error', '未知错误')}"
+            self.status_text.append(message)
+            QMessageBox.warning(self, "失败", message)
+            return
         
+        message = f"翻译完成! 总条目: {stats['total_count']}, 翻译: {stats['translated_count']}, 跳过: {stats['skipped_count']}"
         self.status_text.append(message)
-        QMessageBox.information(self, "完成", message)
+        self.statusBar().showMessage(message, 5000)
+        if self.completion_popup_check.isChecked():
+            QMessageBox.information(self, "完成", message)
     
     def batch_translation_completed(self, results: dict):
         """批量翻译完成"""
@@ -837,21 +1103,27 @@ class TranslationApp(QMainWindow):
         failed_count = sum(1 for r in results.values() if r['status'] == 'failed')
         
         message = f"批量翻译完成! 成功: {success_count}, 失败: {failed_count}"
-        self.batch_status_text.append(message)
-        QMessageBox.information(self, "完成", message)
+        self._log.info(message)
+        self._flush_log()
+        # 完成提示不阻塞事件循环，只有存在失败的文件时才弹窗
+        self.statusBar().showMessage(message, 5000)
+        if failed_count:
+            QMessageBox.warning(self, "完成", message)
     
     def translation_error(self, error_message: str):
         """翻译错误"""
         self.translate_btn.setEnabled(True)
+        self._flush_log()
         self.status_text.append(f"错误: {error_message}")
         QMessageBox.critical(self, "错误", f"翻译失败: {error_message}")
     
     def batch_translation_error(self, error_message: str, file_path: str):
         """批量翻译错误"""
-        self.batch_status_text.append(f"错误 ({file_path}): {error_message}")
+        self._log.error("错误 (%s): %s", file_path, error_message)
     
     def clear_log(self):
         """清空日志"""
+        self._log_buffer.clear()
         self.status_text.clear()
 
 
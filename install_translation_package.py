@@ -1,11 +1,33 @@
 #!/usr/bin/env python3
 """安装英语到中文翻译包的脚本"""
 
-from argostranslate import package
+import time
+from pathlib import Path
+
+from argostranslate import package, settings
+
+# 本地包索引在此时间（秒）内视为最新，不再重新下载
+INDEX_MAX_AGE = 24 * 3600
+
+def _index_is_fresh() -> bool:
+    """本地缓存的包索引是否在有效期内"""
+    index_path = Path(settings.local_package_index)
+    try:
+        return time.time() - index_path.stat().st_mtime < INDEX_MAX_AGE
+    except OSError:
+        return False
 
 def install_translation_package():
-    print("正在更新包索引...")
-    package.update_package_index()
+    # 已安装英语到中文翻译包时无需联网
+    if any(p.from_code == 'en' and p.to_code == 'zh' for p in package.get_installed_packages()):
+        print("英语到中文翻译包已安装")
+        return
+    
+    if _index_is_fresh():
+        print("使用本地缓存的包索引")
+    else:
+        print("正在更新包索引...")
+        package.update_package_index()
     
     print("获取可用包列表...")
     available_packages = package.get_available_packages()
@@ -5,21 +5,114 @@ TS文件翻译工具 - 基于Argos Translate的本地翻译实现
 """
 
 import os
+import re
+import shutil
 import sys
-import xml.etree.ElementTree as ET
-import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from lxml import etree as ET
 from pathlib import Path
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import argostranslate.package
+import argostranslate.settings
 import argostranslate.translate
+from translation_cache import TranslationMemory
+
+# 翻译器实例内缓存的译文条数上限，超出后淘汰最久未使用的条目
+TEXT_CACHE_SIZE = 50000
+
+# 无需翻译的原文：占位符（%1、%n、%s、{count}）、网址、数字和标点的任意组合
+# 先删去占位符和网址，剩余部分只由单个字符类匹配，避免多个可重叠的分支在回溯时指数级尝试拆分方式
+_PLACEHOLDER_RE = re.compile(r'%L?\d+|%[a-zA-Z]|\{[^{}\s]*\}|https?://\S+')
+_SKIP_RE = re.compile(r'[\W\d_]*')
+
+# 已经是中文的原文（至少一个汉字，其余为汉字、全角字符、数字或标点）
+_CJK_RE = re.compile(r'[\u3400-\u9fff]')
+_CJK_TEXT_RE = re.compile(r'[\u3000-\u303f\u3400-\u9fff\uff00-\uffef\W\d_]+')
+
+# 批量翻译时每处理多少条输出一次进度日志
+PROGRESS_LOG_INTERVAL = 100
+
+# 不超过此长度、不含换行和句末标点的文本视为单句，翻译时不做分句
+SHORT_TEXT_LENGTH = 80
+_SENTENCE_END_RE = re.compile(r'[.!?。！？]\s')
+
+# 文件名中常见的语言标识 -> 语言代码
+_LANG_TABLE = {
+    'zh_cn': 'zh', 'zh-cn': 'zh', 'chinese': 'zh',
+    'en': 'en', 'english': 'en',
+    'ja': 'ja', 'japanese': 'ja',
+    'ko': 'ko', 'korean': 'ko',
+    'fr': 'fr', 'french': 'fr',
+    'de': 'de', 'german': 'de',
+    'es': 'es', 'spanish': 'es',
+    'ru': 'ru', 'russian': 'ru',
+    'pt': 'pt', 'portuguese': 'pt',
+    'it': 'it', 'italian': 'it'
+}
+
+_FILENAME_SPLIT_RE = re.compile(r'[_\-.]')
+
+# 在线包索引的有效期（秒），期间内不再重新下载索引
+PACKAGE_INDEX_MAX_AGE = 3600
+
+@lru_cache(maxsize=1024)
+def _detect_language(filename_lower: str) -> str:
+    """
+    从小写文件名检测语言
+    
+    先按 _ - . 拆分后整词查表（相邻两段组合如 zh_cn 优先），查不到时再按子串匹配
+    """
+    tokens = _FILENAME_SPLIT_RE.split(filename_lower)
+    for i, token in enumerate(tokens):
+        if i + 1 < len(tokens):
+            lang_code = _LANG_TABLE.get(f"{token}_{tokens[i + 1]}")
+            if lang_code:
+                return lang_code
+        lang_code = _LANG_TABLE.get(token)
+        if lang_code:
+            return lang_code
+    
+    for key, lang_code in _LANG_TABLE.items():
+        if key in filename_lower:
+            return lang_code
+    
+    # 默认返回英语
+    return 'en'
+
 
 class TsTranslator:
     """TS文件翻译器，使用Argos Translate进行本地翻译"""
     
-    def __init__(self):
+    def __init__(self, intra_threads: int = 0, compute_type: str = None, inter_threads: int = 0):
+        """
+        Args:
+            intra_threads: 每个CTranslate2模型使用的计算线程数（0表示由CTranslate2自动决定）
+            compute_type: CTranslate2模型的计算精度（为None时CPU上使用int8量化，GPU上保持模型默认精度）
+            inter_threads: 同时交给模型翻译的批次数（0表示按CPU核心数自动决定，最多4个）
+        """
         self.logger = self._setup_logger()
         self.installed_packages = set()
+        self._installed_loaded = False  # 是否已读取本机已安装的翻译包
+        self.intra_threads = intra_threads
+        self.compute_type = compute_type
+        if inter_threads <= 0:
+            # CTranslate2每个批次内部已是多线程（默认4个），并行批次数按剩余核心数估算，避免超额占用
+            inter_threads = min(4, max(1, (os.cpu_count() or 1) // (intra_threads or 4)))
+        self.inter_threads = inter_threads
+        self._model_lock = threading.Lock()
+        self._packaged_warned = False  # 是否已提示无法直接调用CTranslate2模型
+        self._install_lock = threading.Lock()
+        # 已解析的翻译对象，持有已加载的模型，按 (源语言, 目标语言) 复用
+        self._translation_cache = {}
+        # 已翻译的文本：(源语言, 目标语言, 原文) -> 译文，跨文件复用
+        self._text_cache = TranslationMemory(max_entries=TEXT_CACHE_SIZE, persistent=False)
+        # 可用翻译包列表及其获取时间
+        self._avail_cache = None
+        self._avail_ts = 0.0
         
     def _setup_logger(self):
         """设置日志记录器"""
@@ -39,11 +132,8 @@ class TsTranslator:
         try:
             self.logger.info(f"检查并安装翻译包: {from_lang} -> {to_lang}")
             
-            # 更新包索引
-            argostranslate.package.update_package_index()
-            
             # 获取可用包
-            available_packages = argostranslate.package.get_available_packages()
+            available_packages = self._available_packages()
             
             # 查找匹配的包
             package_to_install = None
@@ -67,17 +157,53 @@ class TsTranslator:
             self.logger.error(f"安装翻译包失败: {e}")
             return False
     
+    def ensure_package(self, from_lang: str, to_lang: str) -> bool:
+        """
+        确保翻译包已安装（多个线程共享同一翻译器时只安装一次）
+        
+        先查本机已安装的包（只读取一次），都没有时才联网更新索引并安装
+        """
+        key = (from_lang, to_lang)
+        if key in self.installed_packages:
+            return True
+        with self._install_lock:
+            if key in self.installed_packages:
+                return True
+            
+            if not self._installed_loaded:
+                self._installed_loaded = True
+                try:
+                    for pkg in argostranslate.package.get_installed_packages():
+                        self.installed_packages.add((pkg.from_code, pkg.to_code))
+                except Exception as e:
+                    self.logger.warning(f"读取已安装翻译包失败: {e}")
+                if key in self.installed_packages:
+                    return True
+            
+            # 已安装的包可能通过中间语言组合出翻译路径
+            if self._get_translation(from_lang, to_lang) is not None:
+                self.installed_packages.add(key)
+                return True
+            
+            return self.install_translation_package(from_lang, to_lang)
+    
     def _install_via_intermediate_language(self, from_lang: str, to_lang: str) -> bool:
         """通过中间语言安装翻译包"""
         # 常见的中间语言
         intermediate_langs = ['en']  # 英语作为中间语言
         
+        try:
+            available_packages = self._available_packages()
+        except Exception as e:
+            self.logger.error(f"获取可用包失败: {e}")
+            return False
+        
         for intermediate in intermediate_langs:
             try:
                 # 安装 from_lang -> intermediate
-                if self.install_direct_package(from_lang, intermediate):
+                if self.install_direct_package(from_lang, intermediate, available_packages):
                     # 安装 intermediate -> to_lang
-                    if self.install_direct_package(intermediate, to_lang):
+                    if self.install_direct_package(intermediate, to_lang, available_packages):
                         self.logger.info(f"通过中间语言 {intermediate} 建立了翻译路径: {from_lang} -> {to_lang}")
                         return True
             except Exception as e:
@@ -86,10 +212,11 @@ class TsTranslator:
         self.logger.error(f"无法找到从 {from_lang} 到 {to_lang} 的翻译路径")
         return False
     
-    def install_direct_package(self, from_lang: str, to_lang: str) -> bool:
-        """直接安装翻译包"""
+    def install_direct_package(self, from_lang: str, to_lang: str, available_packages: list = None) -> bool:
+        """直接安装翻译包（available_packages为已获取的可用包列表，为None时重新获取）"""
         try:
-            available_packages = argostranslate.package.get_available_packages()
+            if available_packages is None:
+                available_packages = self._available_packages()
             for package in available_packages:
                 if package.from_code == from_lang and package.to_code == to_lang:
                     argostranslate.package.install_from_path(package.download())
@@ -103,115 +230,496 @@ class TsTranslator:
     def translate_text(self, text: str, from_lang: str, to_lang: str) -> str:
         """翻译单个文本"""
         try:
-            if not text or not text.strip():
+            if not text or not text.strip() or self._is_untranslatable(text, to_lang):
                 return text
             
             # 检查是否已安装翻译包
-            if (from_lang, to_lang) not in self.installed_packages:
-                if not self.install_translation_package(from_lang, to_lang):
-                    self.logger.warning(f"无法翻译: {from_lang} -> {to_lang}")
-                    return text
+            if not self.ensure_package(from_lang, to_lang):
+                self.logger.warning(f"无法翻译: {from_lang} -> {to_lang}")
+                return text
             
             # 进行翻译
-            translated = argostranslate.translate.translate(text, from_lang, to_lang)
-            self.logger.debug(f"翻译: '{text}' -> '{translated}'")
+            translation = self._get_translation(from_lang, to_lang)
+            if translation is not None:
+                translated = None
+                if self._is_single_sentence(text):
+                    # 界面上的短文本直接交给模型，省去Argos的分句
+                    outputs = self._translate_packaged_batch(translation, [text], 1)
+                    if outputs is not None:
+                        translated = outputs[0]
+                if translated is None:
+                    translated = translation.translate(text)
+            else:
+                translated = argostranslate.translate.translate(text, from_lang, to_lang)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("翻译: '%s' -> '%s'", text, translated)
             return translated
             
         except Exception as e:
             self.logger.error(f"翻译文本失败: {e}")
             return text
     
-    def parse_ts_file(self, ts_file_path: str) -> List[Dict]:
-        """解析TS文件，提取需要翻译的内容"""
+    @staticmethod
+    def _is_single_sentence(text: str) -> bool:
+        """判断文本是否为无需分句的单句短文本"""
+        return len(text) <= SHORT_TEXT_LENGTH and '\n' not in text and not _SENTENCE_END_RE.search(text)
+    
+    @staticmethod
+    def _is_untranslatable(text: str, to_lang: str) -> bool:
+        """判断文本是否无需经过翻译模型（单个字符、占位符、网址、数字，或目标语言为中文时已是中文）"""
+        s = text.strip()
+        if len(s) <= 1 or _SKIP_RE.fullmatch(_PLACEHOLDER_RE.sub('', s)):
+            return True
+        return to_lang.startswith('zh') and bool(_CJK_RE.search(s)) and bool(_CJK_TEXT_RE.fullmatch(s))
+    
+    def _get_translation(self, from_lang: str, to_lang: str):
+        """
+        获取并缓存Argos翻译对象，使同一实例的所有翻译复用已加载的模型
+        
+        模型在这里由 _load_model 加载，Argos之后翻译时直接复用，不会再以默认精度另行加载
+        """
+        key = (from_lang, to_lang)
+        translation = self._translation_cache.get(key)
+        if translation is None:
+            try:
+                translation = argostranslate.translate.get_translation_from_codes(from_lang, to_lang)
+                if translation is not None:
+                    self._prepare_models(translation)
+            except Exception as e:
+                self.logger.warning(f"获取翻译模型失败 {from_lang} -> {to_lang}: {e}")
+                return None
+            if translation is not None:
+                self._translation_cache[key] = translation
+        return translation
+    
+    def _prepare_models(self, translation):
+        """为翻译对象（包括中间语言组合的两段）加载尚未加载的CTranslate2模型"""
+        translation = self._unwrap_translation(translation)
+        first = getattr(translation, 't1', None)
+        second = getattr(translation, 't2', None)
+        if first is not None and second is not None:
+            self._prepare_models(first)
+            self._prepare_models(second)
+            return
+        pkg = getattr(translation, 'pkg', None)
+        if pkg is not None and getattr(translation, 'translator', False) is None:
+            self._load_model(translation, pkg)
+    
+    def warm_up(self, from_lang: str, to_lang: str) -> bool:
+        """预先加载翻译模型和Argos的分句器，避免首次翻译时才加载"""
+        translation = self._get_translation(from_lang, to_lang)
+        if translation is None:
+            return False
+        try:
+            # 模型已由 _get_translation 加载，先试译一次使权重载入内存
+            self._translate_packaged_batch(translation, ["warmup"], 1)
+            # 长文本仍经由Argos分句后翻译，分句器在首次调用时加载（复用上面的模型）
+            translation.translate("warmup")
+            return True
+        except Exception as e:
+            self.logger.warning(f"预加载翻译模型失败: {e}")
+            return False
+    
+    def translate_batch(self, texts: List[str], from_lang: str, to_lang: str,
+                        max_batch_size: int = 64, progress_callback=None) -> List[str]:
+        """
+        批量翻译文本列表，所有文本按行拆分后一次性提交给CTranslate2模型
+        
+        只有单句短行直接批量交给模型；较长或含多句的行仍经由Argos分句后逐条翻译，
+        避免整段作为一个序列翻译而被截断
+        
+        progress_callback(已完成数, 总数) 在每批翻译完成后调用
+        """
+        results = list(texts)
+        if not texts:
+            return results
+        
+        # 检查是否已安装翻译包
+        if not self.ensure_package(from_lang, to_lang):
+            self.logger.warning(f"无法翻译: {from_lang} -> {to_lang}")
+            return results
+        
+        translation = self._get_translation(from_lang, to_lang)
+        
+        # 空文本和无需翻译的内容原样保留；多行文本按行拆分，各行与其他文本一起批量翻译后再拼接
+        segments = []  # 需要模型翻译的单行文本（不重复）
+        segment_index = {}  # 单行文本 -> segments下标
+        layouts = {}   # 文本下标 -> 各行的 (原行, segments下标)，空行的下标为None
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            if translation is None:
+                results[i] = self.translate_text(text, from_lang, to_lang)
+                continue
+            layout = []
+            for line in text.split('\n'):
+                if line.strip() and not self._is_untranslatable(line, to_lang):
+                    # 不同文本中相同的行只翻译一次
+                    index = segment_index.get(line)
+                    if index is None:
+                        index = segment_index[line] = len(segments)
+                        segments.append(line)
+                    layout.append((line, index))
+                else:
+                    layout.append((line, None))
+            layouts[i] = layout
+        
+        translated_segments = list(segments)
+        total = len(segments)
+        log_progress = self.logger.isEnabledFor(logging.INFO)
+        next_log = PROGRESS_LOG_INTERVAL
+        done = 0
+        short = [i for i, segment in enumerate(segments) if self._is_single_sentence(segment)]
+        long = [i for i, segment in enumerate(segments) if not self._is_single_sentence(segment)]
+        chunks = [(short[start:start + max_batch_size], True)
+                  for start in range(0, len(short), max_batch_size)]
+        chunks += [(long[start:start + max_batch_size], False)
+                   for start in range(0, len(long), max_batch_size)]
+        for indices, outputs in self._iter_translated_chunks(translation, chunks, segments,
+                                                             from_lang, to_lang, max_batch_size):
+            for index, output in zip(indices, outputs):
+                translated_segments[index] = output
+            
+            done += len(outputs)
+            if log_progress and (done >= next_log or done == total):
+                self.logger.info("已处理 %d/%d 条", done, total)
+                next_log = done + PROGRESS_LOG_INTERVAL
+            if progress_callback is not None:
+                progress_callback(done, total)
+        
+        for i, layout in layouts.items():
+            results[i] = '\n'.join(line if index is None else translated_segments[index]
+                                   for line, index in layout)
+        return results
+    
+    def _iter_translated_chunks(self, translation, chunks: List[Tuple[List[int], bool]],
+                                segments: List[str], from_lang: str, to_lang: str,
+                                max_batch_size: int):
+        """
+        翻译各个批次，按完成顺序逐个返回 (segments下标列表, 译文列表)
+        
+        每个批次为 (segments下标列表, 是否直接批量交给模型)；不直接交给模型的批次逐条经由Argos翻译。
+        CTranslate2翻译时会释放GIL，批次较多时由线程池同时提交 inter_threads 个批次
+        """
+        def translate_chunk(indices, packaged):
+            chunk_texts = [segments[i] for i in indices]
+            outputs = None
+            if packaged:
+                outputs = self._translate_packaged_batch(translation, chunk_texts, max_batch_size)
+            if outputs is None:
+                outputs = [self._translate_with_argos(translation, text) for text in chunk_texts]
+            return outputs
+        
+        workers = min(self.inter_threads, len(chunks))
+        if workers <= 1:
+            for indices, packaged in chunks:
+                yield indices, translate_chunk(indices, packaged)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(translate_chunk, indices, packaged): indices
+                       for indices, packaged in chunks}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def _translate_with_argos(self, translation, text: str) -> str:
+        """经由Argos（含分句）翻译单个文本，失败时返回原文"""
+        try:
+            return translation.translate(text)
+        except Exception as e:
+            self.logger.error(f"翻译文本失败: {e}")
+            return text
+    
+    def _translate_packaged_batch(self, translation, texts: List[str],
+                                  max_batch_size: int) -> Optional[List[str]]:
+        """
+        直接调用Argos翻译包底层的CTranslate2模型批量翻译
+        
+        通过中间语言组合的翻译依次批量经过两个模型；无法直接访问模型时返回None
+        """
+        translation = self._unwrap_translation(translation)
+        first = getattr(translation, 't1', None)
+        second = getattr(translation, 't2', None)
+        if first is not None and second is not None:
+            intermediate = self._translate_packaged_batch(first, texts, max_batch_size)
+            if intermediate is None:
+                return None
+            return self._translate_packaged_batch(second, intermediate, max_batch_size)
+        
+        pkg = getattr(translation, 'pkg', None)
+        tokenizer = getattr(pkg, 'tokenizer', None)
+        if pkg is None or tokenizer is None or not hasattr(translation, 'translator'):
+            if not self._packaged_warned:
+                self._packaged_warned = True
+                self.logger.warning(f"无法直接调用翻译包的CTranslate2模型（{type(translation).__name__}），改为逐条翻译")
+            return None
+        
+        try:
+            if translation.translator is None:
+                self._load_model(translation, pkg)
+            
+            tokenized = [tokenizer.encode(text) for text in texts]
+            target_prefix = getattr(pkg, 'target_prefix', None)
+            prefixes = [[target_prefix]] * len(tokenized) if target_prefix else None
+            
+            batch_results = translation.translator.translate_batch(
+                tokenized,
+                target_prefix=prefixes,
+                replace_unknowns=True,
+                max_batch_size=max_batch_size,
+                max_input_length=1024,
+                beam_size=4,
+                num_hypotheses=1,
+                length_penalty=0.2
+            )
+            
+            outputs = []
+            for result in batch_results:
+                tokens = result.hypotheses[0]
+                if target_prefix:
+                    tokens = tokens[1:]
+                value = tokenizer.decode(tokens)
+                if value.startswith(" "):
+                    value = value[1:]
+                outputs.append(value)
+            return outputs
+            
+        except Exception as e:
+            self.logger.warning(f"批量翻译失败，改为逐条翻译: {e}")
+            return None
+    
+    @staticmethod
+    def _unwrap_translation(translation):
+        """取出被Argos的CachedTranslation包装的实际翻译对象"""
+        while getattr(translation, 'underlying', None) is not None:
+            translation = translation.underlying
+        return translation
+    
+    def _load_model(self, translation, pkg):
+        """
+        与Argos相同的方式懒加载模型（多个线程同时翻译时只加载一次）
+        
+        CPU上以int8量化加载以减少内存带宽占用；inter_threads 个批次可同时在模型上运行
+        """
+        with self._model_lock:
+            if translation.translator is not None:
+                return
+            import ctranslate2
+            device = argostranslate.settings.device
+            compute_type = self.compute_type or ('int8' if device == 'cpu' else 'default')
+            translation.translator = ctranslate2.Translator(
+                str(pkg.package_path / "model"),
+                device=device,
+                compute_type=compute_type,
+                inter_threads=self.inter_threads,
+                intra_threads=self.intra_threads
+            )
+    
+    def parse_ts_file(self, ts_file_path: str) -> Tuple[Optional[ET._ElementTree], List[Dict]]:
+        """
+        解析TS文件，提取需要翻译的内容
+        
+        返回的文档树供 generate_translated_ts 原地写入译文，避免再次解析输入文件；
+        需要限制内存占用时请使用 scan_ts_file 流式处理
+        
+        Returns:
+            (文档树, 翻译条目列表)，解析失败时为 (None, [])
+        """
         try:
             tree = ET.parse(ts_file_path)
-            root = tree.getroot()
             
             translations = []
-            for message in root.findall('.//message'):
-                source = message.find('source')
-                translation = message.find('translation')
+            for message in tree.iter('message'):
+                source, translation = self._message_parts(message)
                 
                 if source is not None and source.text:
                     trans_data = {
                         'source': source.text,
                         'translation': translation.text if translation is not None else '',
-                        'type': translation.get('type') if translation is not None else ''
+                        'type': translation.get('type') if translation is not None else '',
+                        'message': message
                     }
                     translations.append(trans_data)
             
             self.logger.info(f"从 {ts_file_path} 解析出 {len(translations)} 条翻译条目")
-            return translations
+            return tree, translations
             
         except Exception as e:
             self.logger.error(f"解析TS文件失败 {ts_file_path}: {e}")
-            return []
+            return None, []
+    
+    @staticmethod
+    def _message_parts(message) -> Tuple[Optional[ET._Element], Optional[ET._Element]]:
+        """一次遍历<message>的子元素，返回 (<source>, <translation>)，不存在的为None"""
+        source = translation = None
+        for child in message:
+            if child.tag == 'source':
+                source = child
+            elif child.tag == 'translation':
+                translation = child
+        return source, translation
+    
+    @staticmethod
+    def is_final_translation(translation_type: str) -> bool:
+        """
+        判断已有译文能否作为其他条目的参考（种子）
+        
+        只使用没有type属性的正式译文；vanished/obsolete等条目的译文可能已过时
+        """
+        return not translation_type
+    
+    @staticmethod
+    def needs_translation(translation_text: str, translation_type: str, skip_translated: bool) -> bool:
+        """判断条目是否需要翻译（跳过已有译文且未标记为unfinished的条目）"""
+        return not (skip_translated and translation_text and translation_type != 'unfinished')
+    
+    def scan_ts_file(self, ts_file_path: str, skip_translated: bool = True,
+                     seeds: Dict[str, str] = None) -> Tuple[List[str], int, int]:
+        """
+        流式扫描TS文件，只收集需要翻译的原文
+        
+        使用 iterparse 逐个处理<message>，处理完立即清空并删除已处理的元素，
+        内存中不保留整棵文档树
+        
+        Args:
+            ts_file_path: TS文件路径
+            skip_translated: 是否跳过已有翻译的条目
+            seeds: 如果指定，文件中的正式译文（没有type属性）会以 {原文: 译文} 写入其中
+            
+        Returns:
+            (需要翻译的原文列表, 跳过数, 总条目数)
+        """
+        sources = []
+        skipped_count = 0
+        total_count = 0
+        for _, elem in ET.iterparse(ts_file_path, events=('end',), tag='message'):
+            source, translation = self._message_parts(elem)
+            if source is not None and source.text:
+                total_count += 1
+                if translation is None:
+                    pending = self.needs_translation('', '', skip_translated)
+                else:
+                    pending = self.needs_translation(translation.text, translation.get('type'),
+                                                      skip_translated)
+                if pending:
+                    sources.append(source.text)
+                else:
+                    skipped_count += 1
+                    if seeds is not None and self.is_final_translation(translation.get('type')):
+                        seeds.setdefault(source.text, translation.text)
+            elem.clear(keep_tail=True)
+            # 删除已处理的兄弟元素，避免文档树随解析逐渐变大
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+        
+        self.logger.info(f"从 {ts_file_path} 解析出 {total_count} 条翻译条目")
+        return sources, skipped_count, total_count
     
     def detect_language_from_filename(self, filename: str) -> str:
         """从文件名检测语言"""
-        filename_lower = filename.lower()
-        
-        # 常见的语言代码映射
-        language_mapping = {
-            'zh_cn': 'zh', 'zh-cn': 'zh', 'chinese': 'zh',
-            'en': 'en', 'english': 'en',
-            'ja': 'ja', 'japanese': 'ja',
-            'ko': 'ko', 'korean': 'ko',
-            'fr': 'fr', 'french': 'fr',
-            'de': 'de', 'german': 'de',
-            'es': 'es', 'spanish': 'es',
-            'ru': 'ru', 'russian': 'ru',
-            'pt': 'pt', 'portuguese': 'pt',
-            'it': 'it', 'italian': 'it'
-        }
-        
-        for key, lang_code in language_mapping.items():
-            if key in filename_lower:
-                return lang_code
+        return _detect_language(filename.lower())
+    
+    def translate_sources(self, sources: List[str], from_lang: str, to_lang: str,
+                          tm_cache=None, progress_callback=None,
+                          seeds: Dict[str, str] = None) -> Dict[str, str]:
+        """
+        翻译一组原文，返回 {原文: 译文}
+        
+        重复的原文只翻译一次。依次查找：文件中已有的译文(seeds)、本实例的译文缓存、
+        翻译记忆，都未命中的原文再批量交给翻译模型。
+        progress_callback(已完成数, 总数) 在每批翻译完成后调用
+        """
+        unique = dict.fromkeys(sources)
+        
+        misses = []
+        for source in unique:
+            cached = seeds.get(source) if seeds else None
+            if cached is None:
+                cached = self._text_cache.get(from_lang, to_lang, source)
+            if cached is None and tm_cache is not None:
+                cached = tm_cache.get(from_lang, to_lang, source)
+                if cached is not None:
+                    self._text_cache.put(from_lang, to_lang, source, cached)
+            if cached is None:
+                misses.append(source)
+            else:
+                unique[source] = cached
+        
+        if misses:
+            self.logger.info(f"{len(sources)} 条待翻译条目中有 {len(misses)} 条不同原文需要模型翻译")
+            outputs = self.translate_batch(misses, from_lang, to_lang,
+                                           progress_callback=progress_callback)
+            for source, translated_text in zip(misses, outputs):
+                # 翻译失败时返回原文，不写入缓存和翻译记忆
+                if translated_text != source:
+                    self._text_cache.put(from_lang, to_lang, source, translated_text)
+                    if tm_cache is not None:
+                        tm_cache.put(from_lang, to_lang, source, translated_text)
+                unique[source] = translated_text
         
-        # 默认返回英语
-        return 'en'
+        if tm_cache is not None:
+            tm_cache.flush()
+        return unique
     
     def translate_ts_file(self, input_ts: str, output_ts: str, from_lang: str, to_lang: str, 
-                         skip_translated: bool = True) -> dict:
-        """翻译整个TS文件"""
+                         skip_translated: bool = True, tm_cache=None,
+                         stream_mode: bool = False) -> dict:
+        """
+        翻译整个TS文件（tm_cache为可选的翻译记忆，跨文件复用已有译文）
+        
+        stream_mode为True时流式读写TS文件，内存中只保留待翻译的原文，适合很大的TS文件
+        """
         try:
             self.logger.info(f"开始翻译: {input_ts} -> {output_ts}")
             self.logger.info(f"翻译方向: {from_lang} -> {to_lang}")
             
+            # 文件中已完成的译文，重复出现的原文直接沿用
+            seeds = {}
+            
             # 解析输入文件
-            translations = self.parse_ts_file(input_ts)
-            if not translations:
+            if stream_mode:
+                sources, skipped_count, total_count = self.scan_ts_file(input_ts, skip_translated, seeds)
+            else:
+                tree, translations = self.parse_ts_file(input_ts)
+                total_count = len(translations)
+            if not total_count:
                 self.logger.error("没有找到可翻译的内容")
                 return {'success': False, 'error': '没有找到可翻译的内容'}
             
             # 安装翻译包
-            if not self.install_translation_package(from_lang, to_lang):
+            if not self.ensure_package(from_lang, to_lang):
                 self.logger.error("翻译包安装失败")
                 return {'success': False, 'error': '翻译包安装失败'}
             
-            # 处理翻译
-            translated_count = 0
-            skipped_count = 0
-            
-            for i, trans in enumerate(translations):
-                # 跳过已翻译的内容（如果设置了跳过）
-                if skip_translated and trans['translation'] and trans['type'] != 'unfinished':
-                    skipped_count += 1
-                    continue
+            if not stream_mode:
+                # 处理翻译
+                skipped_count = 0
+                pending = []  # 需要写入译文的条目
                 
-                # 翻译
-                translated_text = self.translate_text(trans['source'], from_lang, to_lang)
-                translations[i]['translation'] = translated_text
-                translations[i]['type'] = ''  # 清除unfinished标记
-                translated_count += 1
-                
-                # 进度显示
-                if (i + 1) % 10 == 0:
-                    self.logger.info(f"已处理 {i + 1}/{len(translations)} 条")
+                for trans in translations:
+                    # 跳过已翻译的内容（如果设置了跳过）
+                    if not self.needs_translation(trans['translation'], trans['type'], skip_translated):
+                        skipped_count += 1
+                        if self.is_final_translation(trans['type']):
+                            seeds.setdefault(trans['source'], trans['translation'])
+                        continue
+                    pending.append(trans)
+                sources = [trans['source'] for trans in pending]
+            
+            # 同一文件中重复出现的原文只翻译一次
+            unique = self.translate_sources(sources, from_lang, to_lang, tm_cache, seeds=seeds)
+            translated_count = len(sources)
             
             # 生成输出文件
-            self._generate_translated_ts(input_ts, output_ts, translations)
+            if stream_mode:
+                self.write_translated_ts_stream(input_ts, output_ts, unique, skip_translated)
+            else:
+                for trans in pending:
+                    trans['translation'] = unique[trans['source']]
+                    trans['type'] = ''  # 清除unfinished标记
+                # 只有待翻译的条目需要写回文档树
+                self.generate_translated_ts(tree, output_ts, pending)
             
             self.logger.info(f"翻译完成: 翻译了 {translated_count} 条，跳过了 {skipped_count} 条")
             return {
@@ -222,41 +730,37 @@ class TsTranslator:
                 'to_lang': to_lang,
                 'translated_count': translated_count,
                 'skipped_count': skipped_count,
-                'total_count': len(translations)
+                'total_count': total_count
             }
             
         except Exception as e:
             self.logger.error(f"翻译TS文件失败: {e}")
             return {'success': False, 'error': str(e)}
     
-    def _generate_translated_ts(self, input_file: str, output_file: str, translations: List[Dict]):
-        """生成翻译后的TS文件"""
+    def generate_translated_ts(self, tree: ET._ElementTree, output_file: str, translations: List[Dict]):
+        """
+        生成翻译后的TS文件
+        
+        Args:
+            tree: parse_ts_file 返回的文档树，译文直接写入其中
+            output_file: 输出TS文件路径
+            translations: 需要写入译文的条目（parse_ts_file 返回的条目，未列出的条目保持原样）
+        """
         try:
-            tree = ET.parse(input_file)
-            root = tree.getroot()
-            
-            trans_index = 0
-            for message in root.findall('.//message'):
-                source = message.find('source')
-                translation = message.find('translation')
+            for trans in translations:
+                message = trans['message']
+                _, translation = self._message_parts(message)
+                if translation is None:
+                    translation = ET.SubElement(message, 'translation')
                 
-                if source is not None and source.text and trans_index < len(translations):
-                    if translation is None:
-                        translation = ET.SubElement(message, 'translation')
-                    
-                    translation.text = translations[trans_index]['translation']
-                    if 'type' in translations[trans_index] and translations[trans_index]['type']:
-                        translation.set('type', translations[trans_index]['type'])
-                    else:
-                        if 'type' in translation.attrib:
-                            del translation.attrib['type']
-                    
-                    trans_index += 1
-            
-            # 美化XML输出
-            self._prettify_xml(root)
-            
-            # 写入文件
+                translation.text = trans['translation']
+                if trans.get('type'):
+                    translation.set('type', trans['type'])
+                elif 'type' in translation.attrib:
+                    del translation.attrib['type']
+            
+            # 统一缩进后写入文件（与流式输出的格式一致）
+            ET.indent(tree, space="  ")
             tree.write(output_file, encoding='utf-8', xml_declaration=True)
             self.logger.info(f"已生成翻译文件: {output_file}")
             
@@ -264,23 +768,120 @@ class TsTranslator:
             self.logger.error(f"生成翻译文件失败: {e}")
             raise
     
-    def _prettify_xml(self, element, level=0):
-        """美化XML格式"""
-        # 缩进处理
-        indent = "\n" + level * "  "
-        if len(element):
-            if not element.text or not element.text.strip():
-                element.text = indent + "  "
-            if not element.tail or not element.tail.strip():
-                element.tail = indent
-            for child in element:
-                self._prettify_xml(child, level + 1)
-            if not child.tail or not child.tail.strip():
-                child.tail = indent
-        else:
-            if level and (not element.tail or not element.tail.strip()):
-                element.tail = indent
-
+    def write_translated_ts_stream(self, input_file: str, output_file: str,
+                                   translated: Dict[str, str], skip_translated: bool = True):
+        """
+        流式生成翻译后的TS文件
+        
+        输出经由 lxml 的 xmlfile 增量写出：<TS>和<context>作为打开的元素，
+        其余元素和注释在读取完成后立即写入译文、序列化并从文档树中删除，
+        内存中只保留当前正在处理的元素。
+        输出先写入同目录下的临时文件，完成后再替换目标文件，输出路径与输入相同时也不会在读取前被清空
+        
+        Args:
+            input_file: 输入TS文件路径
+            output_file: 输出TS文件路径
+            translated: {原文: 译文}
+            skip_translated: 是否跳过已有翻译的条目（须与扫描时一致）
+        """
+        # 输出路径是符号链接时替换其指向的文件，与直接覆盖写入的效果一致
+        target = os.path.realpath(output_file)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'xb') as out:
+                self._stream_translated_ts(input_file, out, translated, skip_translated)
+            if os.path.exists(target):
+                shutil.copymode(target, temp_path)
+            os.replace(temp_path, target)
+            self.logger.info(f"已生成翻译文件: {output_file}")
+            
+        except Exception as e:
+            self.logger.error(f"生成翻译文件失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def _stream_translated_ts(self, input_file: str, out, translated: Dict[str, str],
+                              skip_translated: bool):
+        """逐个读取输入TS文件的节点，写入译文后输出到已打开的二进制文件out"""
+        # 从根到当前元素，每层为容器（<TS> 及其下的 <context>）在输出中打开的元素，非容器为None
+        stack = []
+        # 根元素之后的注释，xmlfile 不允许在根元素结束后继续写入，最后直接追加到文件末尾
+        trailing = []
+        started = root_closed = False
+        with ET.xmlfile(out, encoding='UTF-8') as xf:
+            for event, elem in ET.iterparse(input_file, events=('start', 'end', 'comment', 'pi')):
+                if not started:
+                    started = True
+                    xf.write_declaration()
+                    # lxml可以取得原文件的DOCTYPE声明（如<!DOCTYPE TS>），原样保留
+                    doctype = elem.getroottree().docinfo.doctype
+                    if doctype:
+                        xf.write_doctype(doctype)
+                
+                if event in ('comment', 'pi'):
+                    depth = len(stack)
+                    if elem.getparent() is None:
+                        # 根元素前后的注释与DOM方式一样紧贴根元素写出
+                        if root_closed:
+                            trailing.append(ET.tostring(elem, encoding='utf-8'))
+                        else:
+                            xf.write(elem)
+                    elif stack[-1] is not None:
+                        # 容器内的注释与<message>等子元素一样单独写出
+                        elem.tail = None
+                        xf.write("\n" + '  ' * depth)
+                        xf.write(elem)
+                        elem.getparent().remove(elem)
+                    continue
+                
+                if event == 'start':
+                    depth = len(stack)
+                    is_container = depth == 0 or (depth == 1 and elem.tag == 'context')
+                    writer = None
+                    if is_container:
+                        if depth:
+                            xf.write("\n" + '  ' * depth)
+                        writer = xf.element(elem.tag, dict(elem.attrib))
+                        writer.__enter__()
+                    stack.append(writer)
+                    continue
+                
+                writer = stack.pop()
+                depth = len(stack)
+                if elem.tag == 'message':
+                    self._apply_stream_translation(elem, translated, skip_translated)
+                
+                if writer is not None:
+                    xf.write("\n" + '  ' * depth)
+                    writer.__exit__(None, None, None)
+                    elem.clear()
+                    root_closed = not depth
+                elif stack[-1] is not None:
+                    # 容器的直接子元素（如<name>、<message>）整体写出后从文档树中删除
+                    ET.indent(elem, space="  ", level=depth)
+                    elem.tail = None
+                    xf.write("\n" + '  ' * depth)
+                    xf.write(elem)
+                    elem.getparent().remove(elem)
+        for data in trailing:
+            out.write(data)
+    
+    def _apply_stream_translation(self, message, translated: Dict[str, str], skip_translated: bool):
+        """将译文写入单个<message>元素"""
+        source, translation = self._message_parts(message)
+        if source is None or not source.text:
+            return
+        if translation is not None and not self.needs_translation(
+                translation.text, translation.get('type'), skip_translated):
+            return
+        if translation is None:
+            translation = ET.SubElement(message, 'translation')
+        translation.text = translated.get(source.text, source.text)
+        # 清除unfinished标记
+        if 'type' in translation.attrib:
+            del translation.attrib['type']
+    
     def get_installed_packages(self):
         """获取已安装的翻译包"""
         try:
@@ -292,14 +893,34 @@ class TsTranslator:
             self.logger.error(f"获取已安装包失败: {e}")
             return []
 
+    def _available_packages(self) -> list:
+        """
+        获取可用翻译包列表（带缓存）
+        
+        以Argos本地包索引文件（settings.local_package_index）的修改时间判断是否需要更新，
+        索引不存在或超过 PACKAGE_INDEX_MAX_AGE 时才重新下载；列表本身缓存在实例上
+        """
+        now = time.time()
+        if self._avail_cache is not None and now - self._avail_ts < PACKAGE_INDEX_MAX_AGE:
+            return self._avail_cache
+        
+        index_path = Path(argostranslate.settings.local_package_index)
+        try:
+            index_ts = index_path.stat().st_mtime
+        except OSError:
+            index_ts = 0.0
+        if now - index_ts >= PACKAGE_INDEX_MAX_AGE:
+            argostranslate.package.update_package_index()
+            index_ts = now
+        
+        self._avail_cache = argostranslate.package.get_available_packages()
+        self._avail_ts = index_ts
+        return self._avail_cache
+    
     def get_available_packages(self):
         """获取可用的翻译包"""
         try:
-            # 更新包索引
-            argostranslate.package.update_package_index()
-            
-            # 获取可用包
-            available_packages = argostranslate.package.get_available_packages()
+            available_packages = self._available_packages()
             self.logger.info(f"获取到 {len(available_packages)} 个可用翻译包")
             return available_packages
         except Exception as e:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量翻译的任务规划测试：增量翻译的附属文件、输出文件冲突和 --dry-run
+
+只使用 dry_run 模式的 BatchTranslator，不加载翻译引擎
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_translator import BatchTranslator, _file_digest, _write_sidecar  # noqa: E402
+
+SAMPLE_TS = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE TS>
+<TS version="2.1">
+<context>
+    <name>Main</name>
+    <message>
+        <source>Open File</source>
+        <translation type="unfinished"></translation>
+    </message>
+</context>
+</TS>
+"""
+
+
+class BatchPlanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_ts(self, relative: str, text: str = SAMPLE_TS) -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        return path
+
+    def make_batch(self, target_lang: str = 'zh') -> BatchTranslator:
+        batch = BatchTranslator('en', target_lang, tm_path=None, dry_run=True)
+        batch.logger.setLevel(logging.CRITICAL)
+        return batch
+
+    def translated(self, ts_file: Path, target_lang: str = 'zh') -> Path:
+        """模拟一次已完成的翻译：写出输出文件及其附属文件"""
+        output = ts_file.with_name(f'{ts_file.stem}_{target_lang}.ts')
+        output.write_text(SAMPLE_TS, encoding='utf-8')
+        _write_sidecar(str(output), 'en', target_lang, _file_digest(str(ts_file)))
+        return output
+
+
+class SidecarTest(BatchPlanTestCase):
+
+    def test_output_with_matching_sidecar_is_up_to_date(self):
+        ts_file = self.make_ts('app.ts')
+        output = self.translated(ts_file)
+
+        self.assertTrue(self.make_batch()._is_up_to_date(ts_file, output))
+
+    def test_language_change_makes_output_stale(self):
+        ts_file = self.make_ts('app.ts')
+        output = self.translated(ts_file)
+
+        self.assertFalse(self.make_batch('ja')._is_up_to_date(ts_file, output))
+
+    def test_touch_without_content_change_keeps_output(self):
+        ts_file = self.make_ts('app.ts')
+        output = self.translated(ts_file)
+        later = time.time() + 60
+        os.utime(ts_file, (later, later))
+
+        self.assertTrue(self.make_batch()._is_up_to_date(ts_file, output))
+
+    def test_content_change_makes_output_stale(self):
+        ts_file = self.make_ts('app.ts')
+        output = self.translated(ts_file)
+        ts_file.write_text(SAMPLE_TS.replace('Open File', 'Close File'), encoding='utf-8')
+        later = time.time() + 60
+        os.utime(ts_file, (later, later))
+
+        self.assertFalse(self.make_batch()._is_up_to_date(ts_file, output))
+
+    def test_missing_sidecar_makes_output_stale(self):
+        ts_file = self.make_ts('app.ts')
+        output = ts_file.with_name('app_zh.ts')
+        output.write_text(SAMPLE_TS, encoding='utf-8')
+
+        self.assertFalse(self.make_batch()._is_up_to_date(ts_file, output))
+
+
+class DryRunPlanTest(BatchPlanTestCase):
+
+    def test_dry_run_lists_stale_files_and_skips_up_to_date_ones(self):
+        fresh = self.make_ts('a/fresh.ts')
+        stale = self.make_ts('b/stale.ts')
+        self.translated(fresh)
+
+        results = self.make_batch().batch_translate([str(self.root)])
+
+        self.assertEqual(results[str(fresh)]['status'], 'cached')
+        self.assertEqual(results[str(stale)]['status'], 'would-translate')
+        self.assertEqual(results[str(stale)]['output_file'], str(stale.with_name('stale_zh.ts')))
+        # 本次生成的输出文件不会被当作输入
+        self.assertEqual(len(results), 2)
+
+    def test_dry_run_does_not_create_output_dir(self):
+        ts_file = self.make_ts('app.ts')
+        output_dir = self.root / 'out'
+
+        results = self.make_batch().batch_translate([str(ts_file)], str(output_dir))
+
+        self.assertEqual(results[str(ts_file)]['output_file'], str(output_dir / 'app.ts'))
+        self.assertFalse(output_dir.exists())
+
+    def test_same_output_name_in_output_dir_is_a_conflict(self):
+        first = self.make_ts('a/app.ts')
+        second = self.make_ts('b/app.ts')
+
+        results = self.make_batch().batch_translate([str(first), str(second)], str(self.root / 'out'))
+
+        self.assertEqual(results[str(first)]['status'], 'would-translate')
+        self.assertEqual(results[str(second)]['status'], 'failed')
+        self.assertIn(str(first), results[str(second)]['error'])
+
+    def test_same_file_given_twice_is_planned_once(self):
+        ts_file = self.make_ts('a/app.ts')
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+
+        results = self.make_batch().batch_translate([os.path.join('a', 'app.ts'), str(ts_file)])
+
+        self.assertEqual(list(results), [os.path.join('a', 'app.ts')])
+        self.assertEqual(results[os.path.join('a', 'app.ts')]['status'], 'would-translate')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量翻译直连CTranslate2模型的测试
+
+使用与 Argos Translate 1.9 相同对象结构的替身模块（CachedTranslation 包装
+PackageTranslation，中间语言翻译为 CompositeTranslation），不需要真实的翻译模型
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeCT2Translator:
+    """记录调用情况的CTranslate2翻译器替身：把每个词转为大写"""
+
+    instances = []
+
+    def __init__(self, model_path, device='cpu', compute_type='default', inter_threads=1, intra_threads=0):
+        self.model_path = model_path
+        self.compute_type = compute_type
+        self.inter_threads = inter_threads
+        self.intra_threads = intra_threads
+        self.batches = []
+        FakeCT2Translator.instances.append(self)
+
+    def translate_batch(self, tokenized, target_prefix=None, **kwargs):
+        self.batches.append(tokenized)
+        return [types.SimpleNamespace(hypotheses=[[token.upper() for token in tokens]])
+                for tokens in tokenized]
+
+
+class FakeTokenizer:
+    def encode(self, text):
+        return text.split(' ')
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+class PackageTranslation:
+    """与Argos相同：首次翻译时才自行创建CTranslate2模型"""
+
+    def __init__(self, name):
+        self.pkg = types.SimpleNamespace(tokenizer=FakeTokenizer(), target_prefix='',
+                                         package_path=Path('/models') / name)
+        self.translator = None
+        self.translate_calls = 0
+
+    def translate(self, text):
+        self.translate_calls += 1
+        if self.translator is None:
+            self.translator = FakeCT2Translator(str(self.pkg.package_path / 'model'))
+        return text.upper()
+
+
+class CompositeTranslation:
+    def __init__(self, t1, t2):
+        self.t1 = t1
+        self.t2 = t2
+
+    def translate(self, text):
+        return self.t2.translate(self.t1.translate(text))
+
+
+class CachedTranslation:
+    def __init__(self, underlying):
+        self.underlying = underlying
+
+    def translate(self, text):
+        return self.underlying.translate(text)
+
+
+TRANSLATIONS = {}
+
+
+# 替身模块替换的模块名；main和batch_translator在替身下导入，测试结束后一并移除
+FAKE_MODULE_NAMES = ('argostranslate', 'argostranslate.package', 'argostranslate.settings',
+                     'argostranslate.translate', 'ctranslate2', 'main', 'batch_translator')
+_original_modules = {}
+
+TsTranslator = None
+BatchTranslator = None
+
+
+def _fake_modules():
+    argos = types.ModuleType('argostranslate')
+    package = types.ModuleType('argostranslate.package')
+    package.get_installed_packages = lambda: [types.SimpleNamespace(from_code=f, to_code=t)
+                                              for f, t in TRANSLATIONS]
+    settings = types.ModuleType('argostranslate.settings')
+    settings.device = 'cpu'
+    translate = types.ModuleType('argostranslate.translate')
+    translate.get_translation_from_codes = lambda f, t: TRANSLATIONS.get((f, t))
+    argos.package, argos.settings, argos.translate = package, settings, translate
+    ct2 = types.ModuleType('ctranslate2')
+    ct2.Translator = FakeCT2Translator
+    return {
+        'argostranslate': argos,
+        'argostranslate.package': package,
+        'argostranslate.settings': settings,
+        'argostranslate.translate': translate,
+        'ctranslate2': ct2,
+    }
+
+
+def setUpModule():
+    global TsTranslator, BatchTranslator
+    for name in FAKE_MODULE_NAMES:
+        if name in sys.modules:
+            _original_modules[name] = sys.modules.pop(name)
+    sys.modules.update(_fake_modules())
+    from main import TsTranslator
+    from batch_translator import BatchTranslator
+
+
+def tearDownModule():
+    for name in FAKE_MODULE_NAMES:
+        sys.modules.pop(name, None)
+    sys.modules.update(_original_modules)
+    _original_modules.clear()
+
+
+class PackagedBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        FakeCT2Translator.instances.clear()
+        self.direct = PackageTranslation('en_zh')
+        TRANSLATIONS.clear()
+        TRANSLATIONS[('en', 'zh')] = CachedTranslation(self.direct)
+        self.translator = TsTranslator(inter_threads=1)
+
+    def test_batch_uses_ct2_through_cached_translation(self):
+        results = self.translator.translate_batch(['Open file', 'Save as\nClose'], 'en', 'zh')
+
+        self.assertEqual(results, ['OPEN FILE', 'SAVE AS\nCLOSE'])
+        self.assertEqual(len(FakeCT2Translator.instances), 1)
+        self.assertEqual(len(FakeCT2Translator.instances[0].batches), 1)
+        self.assertEqual(self.direct.translate_calls, 0)
+
+    def test_multi_sentence_lines_go_through_argos(self):
+        paragraph = 'Choose a folder. The files in it will be translated.'
+        results = self.translator.translate_batch(['Open file', paragraph], 'en', 'zh')
+
+        self.assertEqual(results, ['OPEN FILE', paragraph.upper()])
+        self.assertEqual(FakeCT2Translator.instances[0].batches, [[['Open', 'file']]])
+        self.assertEqual(self.direct.translate_calls, 1)
+
+    def test_chunks_are_submitted_concurrently(self):
+        translator = TsTranslator(inter_threads=3)
+        texts = [f'item {i}' for i in range(10)]
+        progress = []
+        results = translator.translate_batch(texts, 'en', 'zh', max_batch_size=3,
+                                             progress_callback=lambda done, total: progress.append(done))
+
+        self.assertEqual(results, [text.upper() for text in texts])
+        self.assertEqual(len(self.direct.translator.batches), 4)
+        self.assertEqual(self.direct.translator.inter_threads, 3)
+        self.assertEqual(progress[-1], 10)
+        self.assertEqual(self.direct.translate_calls, 0)
+
+    def test_pivot_translation_batches_through_both_models(self):
+        first, second = PackageTranslation('de_en'), PackageTranslation('en_zh')
+        TRANSLATIONS[('de', 'zh')] = CachedTranslation(
+            CompositeTranslation(CachedTranslation(first), CachedTranslation(second)))
+
+        results = self.translator.translate_batch(['Datei öffnen'], 'de', 'zh')
+
+        self.assertEqual(results, ['DATEI ÖFFNEN'])
+        self.assertIsNotNone(first.translator)
+        self.assertIsNotNone(second.translator)
+        self.assertEqual(first.translate_calls + second.translate_calls, 0)
+
+    def test_warm_up_loads_the_only_model_with_int8(self):
+        self.assertTrue(self.translator.warm_up('en', 'zh'))
+
+        # Argos 翻译时复用已加载的模型，不会以默认精度另行创建
+        self.assertEqual(len(FakeCT2Translator.instances), 1)
+        self.assertIs(self.direct.translator, FakeCT2Translator.instances[0])
+        self.assertEqual(self.direct.translator.compute_type, 'int8')
+
+    def test_short_text_skips_argos_sentence_splitting(self):
+        self.assertEqual(self.translator.translate_text('Open file', 'en', 'zh'), 'OPEN FILE')
+        self.assertEqual(self.direct.translate_calls, 0)
+
+        paragraph = 'Choose a folder. The files in it will be translated.'
+        self.assertEqual(self.translator.translate_text(paragraph, 'en', 'zh'), paragraph.upper())
+        self.assertEqual(self.direct.translate_calls, 1)
+
+    def test_warm_up_runs_model_and_sentence_splitter(self):
+        self.assertTrue(self.translator.warm_up('en', 'zh'))
+
+        self.assertEqual(len(self.direct.translator.batches), 1)
+        self.assertEqual(self.direct.translate_calls, 1)
+
+    def test_untranslatable_check_is_linear(self):
+        self.assertTrue(TsTranslator._is_untranslatable('%L1 / {count}', 'zh'))
+        self.assertFalse(TsTranslator._is_untranslatable('%1 ' * 2000 + 'files', 'zh'))
+        self.assertFalse(TsTranslator._is_untranslatable('，' * 2000 + 'a', 'zh'))
+
+    def test_intra_threads_reach_the_model(self):
+        translator = TsTranslator(intra_threads=2, inter_threads=1)
+        translator.translate_batch(['Open file'], 'en', 'zh')
+
+        self.assertEqual(self.direct.translator.intra_threads, 2)
+        self.assertEqual(self.direct.translator.inter_threads, 1)
+
+
+STALE_TS = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE TS>
+<TS version="2.1" language="zh_CN">
+<context>
+    <name>Old</name>
+    <message>
+        <source>Open File</source>
+        <translation type="vanished">Old</translation>
+    </message>
+    <message>
+        <source>Save File</source>
+        <translation>保存文件</translation>
+    </message>
+</context>
+<context>
+    <name>New</name>
+    <message>
+        <source>Open File</source>
+        <translation type="unfinished"></translation>
+    </message>
+    <message>
+        <source>Save File</source>
+        <translation type="unfinished"></translation>
+    </message>
+</context>
+</TS>
+"""
+
+
+class TranslateTsFileTest(unittest.TestCase):
+
+    def setUp(self):
+        TRANSLATIONS.clear()
+        TRANSLATIONS[('en', 'zh')] = CachedTranslation(PackageTranslation('en_zh'))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = Path(self.tmp.name) / 'app_zh_CN.ts'
+        self.input.write_text(STALE_TS, encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_vanished_translations_are_not_reused(self):
+        for stream_mode in (False, True):
+            output = Path(self.tmp.name) / f'out_{stream_mode}.ts'
+            result = TsTranslator(inter_threads=1).translate_ts_file(
+                str(self.input), str(output), 'en', 'zh', stream_mode=stream_mode)
+
+            self.assertTrue(result['success'])
+            text = output.read_text(encoding='utf-8')
+            self.assertIn('<translation>OPEN FILE</translation>', text)
+            self.assertEqual(text.count('<translation>保存文件</translation>'), 2)
+
+    def test_stream_mode_overwrites_input_in_place(self):
+        result = TsTranslator(inter_threads=1).translate_ts_file(
+            str(self.input), str(self.input), 'en', 'zh', stream_mode=True)
+
+        self.assertTrue(result['success'])
+        self.assertIn('<translation>OPEN FILE</translation>', self.input.read_text(encoding='utf-8'))
+        self.assertEqual([p.name for p in Path(self.tmp.name).iterdir()], [self.input.name])
+
+    def test_batched_stream_mode_overwrites_input_in_place(self):
+        batch = BatchTranslator(tm_path=None, translator=TsTranslator(inter_threads=1))
+        results = batch.translate_files_batched([str(self.input)], [str(self.input)], stream_mode=True)
+
+        self.assertEqual(results[str(self.input)]['status'], 'success')
+        self.assertIn('<translation>OPEN FILE</translation>', self.input.read_text(encoding='utf-8'))
+
+    def test_batched_inputs_with_the_same_output_are_conflicts(self):
+        other = Path(self.tmp.name) / 'other.ts'
+        other.write_text(STALE_TS, encoding='utf-8')
+        output = Path(self.tmp.name) / 'out.ts'
+        batch = BatchTranslator(tm_path=None, translator=TsTranslator(inter_threads=1))
+        results = batch.translate_files_batched(
+            [str(self.input), str(other)],
+            [str(output), os.path.join(self.tmp.name, '.', 'out.ts')])
+
+        self.assertEqual(results[str(self.input)]['status'], 'success')
+        self.assertEqual(results[str(other)]['status'], 'failed')
+        self.assertIn(str(self.input), results[str(other)]['error'])
+
+    def test_stream_and_dom_output_keep_comments_alike(self):
+        self.input.write_text(STALE_TS.replace('<context>', '<!-- generated -->\n<context>', 1)
+                              .replace('<name>New</name>', '<name>New</name>\n    <!-- note -->'),
+                              encoding='utf-8')
+        outputs = []
+        for stream_mode in (False, True):
+            output = Path(self.tmp.name) / f'out_{stream_mode}.ts'
+            TsTranslator(inter_threads=1).translate_ts_file(
+                str(self.input), str(output), 'en', 'zh', stream_mode=stream_mode)
+            outputs.append(output.read_bytes())
+
+        self.assertIn(b'<!-- generated -->', outputs[0])
+        self.assertIn(b'<!-- note -->', outputs[0])
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译记忆缓存
+按 (源语言, 目标语言, 原文) 缓存翻译结果，并持久化到本地SQLite数据库，
+使不同文件、不同运行之间重复出现的文本无需再次经过翻译模型
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# 默认的翻译记忆库位置
+DEFAULT_TM_PATH = Path.home() / ".cache" / "tstranslationhelper" / "tm.sqlite"
+
+# 每累计多少条新记录提交一次数据库事务
+COMMIT_BATCH_SIZE = 500
+
+# 内存中最多保留的条目数，超出后淘汰最久未使用的条目
+MAX_MEMORY_ENTRIES = 65536
+
+# 进程内共享的翻译记忆实例，按数据库路径区分
+_shared_memories = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_memory(db_path: str = None) -> 'TranslationMemory':
+    """
+    获取进程内共享的翻译记忆实例
+
+    同一进程中的多个翻译器（如GUI的单文件与批量翻译）共用同一份内存缓存
+    """
+    path = Path(db_path) if db_path else DEFAULT_TM_PATH
+    with _shared_lock:
+        memory = _shared_memories.get(path)
+        if memory is None:
+            memory = TranslationMemory(str(path))
+            _shared_memories[path] = memory
+        return memory
+
+
+class TranslationMemory:
+    """翻译记忆类：内存LRU缓存 + SQLite持久化"""
+
+    def __init__(self, db_path: str = None, max_entries: int = MAX_MEMORY_ENTRIES,
+                 persistent: bool = True):
+        """
+        初始化翻译记忆
+
+        Args:
+            db_path: SQLite数据库路径（如果为None，则使用默认路径）
+            max_entries: 内存中最多保留的条目数
+            persistent: 为False时只使用内存缓存，不打开数据库
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_TM_PATH
+        self.max_entries = max_entries
+        self.logger = logging.getLogger('TranslationMemory')
+        self.cache = OrderedDict()
+        self._pending = 0
+        # 内存缓存和数据库连接可能被多个线程同时访问
+        self._lock = threading.RLock()
+        self._conn = self._connect() if persistent else None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开数据库连接，失败时仅使用内存缓存"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # 连接可能在不同的线程中使用（如GUI的后台翻译线程）
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tm (key BLOB PRIMARY KEY, translation TEXT NOT NULL)"
+            )
+            conn.commit()
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            # 目录不可写、路径无效等情况下退化为仅使用内存缓存
+            self.logger.warning(f"无法打开翻译记忆库 {self.db_path}: {e}")
+            return None
+
+    @staticmethod
+    def _hash_key(from_lang: str, to_lang: str, text: str) -> bytes:
+        """计算数据库主键（BLAKE2哈希）"""
+        data = f"{from_lang}\0{to_lang}\0{text}".encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, from_lang: str, to_lang: str, text: str) -> Optional[str]:
+        """
+        查询翻译记忆
+
+        Returns:
+            已缓存的译文，未命中时返回None
+        """
+        key = (from_lang, to_lang, text)
+        with self._lock:
+            translation = self.cache.get(key)
+            if translation is not None:
+                self.cache.move_to_end(key)
+                return translation
+            if self._conn is None:
+                return None
+
+            try:
+                row = self._conn.execute(
+                    "SELECT translation FROM tm WHERE key = ?",
+                    (self._hash_key(from_lang, to_lang, text),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self.logger.warning(f"查询翻译记忆失败: {e}")
+                return None
+
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, from_lang: str, to_lang: str, text: str, translation: str):
+        """写入翻译记忆"""
+        with self._lock:
+            self._remember((from_lang, to_lang, text), translation)
+            if self._conn is None:
+                return
+
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO tm (key, translation) VALUES (?, ?)",
+                    (self._hash_key(from_lang, to_lang, text), translation)
+                )
+                self._pending += 1
+                if self._pending >= COMMIT_BATCH_SIZE:
+                    self.flush()
+            except sqlite3.Error as e:
+                self.logger.warning(f"写入翻译记忆失败: {e}")
+
+    def _remember(self, key, translation: str):
+        """写入内存缓存，超出容量时淘汰最久未使用的条目"""
+        self.cache[key] = translation
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def flush(self):
+        """提交尚未写入数据库的记录"""
+        with self._lock:
+            if self._conn is None or not self._pending:
+                return
+            try:
+                self._conn.commit()
+                self._pending = 0
+            except sqlite3.Error as e:
+                self.logger.warning(f"提交翻译记忆失败: {e}")
+
+    def close(self):
+        """提交并关闭数据库连接"""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None